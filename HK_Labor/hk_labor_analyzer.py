@@ -43,8 +43,12 @@ class HKLaborAnalyzer:
                 print(f"  最小值: {stats['min']:.2f}")
                 print(f"  标准差: {stats['std']:.2f}")
                 
-    def plot_trends(self):
-        """绘制趋势图"""
+    def plot_trends(self, output='hk_labor_trends.png', show=True, dpi=300):
+        """绘制趋势图
+
+        ``output`` may be a path or a writable binary file object (written as PNG);
+        with ``show=False`` the figure is closed instead of displayed.
+        """
         if self.df is None:
             return
             
@@ -77,9 +81,14 @@ class HKLaborAnalyzer:
         
         # 调整布局
         plt.tight_layout()
-        plt.savefig('hk_labor_trends.png', dpi=300, bbox_inches='tight')
-        plt.show()
-        print("趋势图已保存为: hk_labor_trends.png")
+        fig.savefig(output, format=None if isinstance(output, str) else 'png',
+                    dpi=dpi, bbox_inches='tight')
+        if show:
+            plt.show()
+        else:
+            plt.close(fig)
+        if isinstance(output, str):
+            print(f"趋势图已保存为: {output}")
         
     def generate_summary_report(self):
         """生成简化的摘要报告"""
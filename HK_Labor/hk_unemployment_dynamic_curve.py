@@ -7,9 +7,19 @@ Focus on particle explosion effects, unemployment rate drives explosion intensit
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.animation import FuncAnimation
+from matplotlib.colors import to_rgb
+from PIL import Image, GifImagePlugin
 import math
 import colorsys
+import time
+import os
+import json
+import hashlib
+import io
+import shutil
+import struct
+import argparse
 
 # Set Chinese font support (for displaying Chinese characters if needed)
 plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
@@ -27,21 +37,263 @@ class Particle:
         self.max_life = life  # Maximum lifetime
         self.gravity = -0.02  # Gravity effect
 
+class ParticlePool:
+    """Fixed-capacity particle storage
+
+    Particles live in preallocated NumPy arrays. Dead slots are recycled by
+    later explosions, so the particle system never allocates per frame and
+    the number of live particles can never exceed ``capacity``.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.rgb = np.zeros((capacity, 3))
+        self.alive = np.zeros(capacity, dtype=bool)
+        # Scratch buffers reused by draw()
+        self._face = np.zeros((capacity, 4))
+        self._edge = np.ones((capacity, 4))
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def clear(self):
+        self.alive[:] = False
+        self.life[:] = 0.0
+
+    STATE_FIELDS = ('x', 'y', 'vx', 'vy', 'life', 'size', 'rgb', 'alive')
+
+    def state_dict(self):
+        """Snapshot of the pool contents (arrays are copied)"""
+        return {name: getattr(self, name).copy() for name in self.STATE_FIELDS}
+
+    def load_state_dict(self, state):
+        """Restore a snapshot taken with state_dict()"""
+        if len(state['alive']) != self.capacity:
+            raise ValueError(f"Snapshot capacity {len(state['alive'])} "
+                             f"does not match pool capacity {self.capacity}")
+        for name in self.STATE_FIELDS:
+            getattr(self, name)[...] = state[name]
+
+    def spawn(self, x, y, vx, vy, size, rgb):
+        """Place new particles into free slots, recycling the oldest when full"""
+        n = min(len(x), self.capacity)
+        free = np.flatnonzero(~self.alive)
+        if len(free) < n:
+            # Pool exhausted: reuse the live particles closest to dying
+            alive = np.flatnonzero(self.alive)
+            oldest = alive[np.argsort(self.life[alive])[:n - len(free)]]
+            free = np.concatenate([free, oldest])
+        slots = free[:n]
+
+        self.x[slots] = x[:n]
+        self.y[slots] = y[:n]
+        self.vx[slots] = vx[:n]
+        self.vy[slots] = vy[:n]
+        self.size[slots] = size[:n]
+        self.rgb[slots] = rgb[:n]
+        self.life[slots] = 1.0
+        self.alive[slots] = True
+
+    def step(self):
+        """Advance all live particles by one frame"""
+        idx = np.flatnonzero(self.alive)
+        self.x[idx] += self.vx[idx]
+        self.y[idx] += self.vy[idx]
+        self.life[idx] -= 0.015  # Slightly slower dissipation
+        self.vy[idx] -= 0.008  # Light gravity
+        self.vx[idx] *= 0.99  # Air resistance
+        self.vy[idx] *= 0.99
+        self.alive[idx] = self.life[idx] > 0
+
+    def visible(self, rng, flicker=True):
+        """Indices, marker sizes (points^2) and alphas of the live particles"""
+        idx = np.flatnonzero(self.alive)
+        life_ratio = self.life[idx]
+        alpha = life_ratio * 0.8  # Transparency decreases with life
+        if flicker and len(idx):
+            alpha *= 0.8 + 0.2 * rng.random(len(idx))
+        size = self.size[idx] * (0.5 + 0.5 * life_ratio)  # Size decreases with life
+        return idx, size, alpha
+
+    def draw(self, ax, rng, flicker=True, glow=True):
+        """Draw all live particles with one scatter call (plus one for glow)"""
+        idx, size, alpha = self.visible(rng, flicker)
+        if len(idx) == 0:
+            return
+        life_ratio = self.life[idx]
+
+        n = len(idx)
+        face = self._face[:n]
+        face[:, :3] = self.rgb[idx]
+        face[:, 3] = alpha
+        edge = self._edge[:n]
+        edge[:, 3] = alpha
+        ax.scatter(self.x[idx], self.y[idx], s=size, c=face,
+                   zorder=7, edgecolors=edge, linewidth=0.5)
+
+        # 为即将消失的粒子添加光晕效果
+        fading = life_ratio < 0.3
+        if glow and fading.any():
+            glow_rgba = np.ones((np.count_nonzero(fading), 4))
+            glow_rgba[:, 3] = alpha[fading] * 0.3
+            ax.scatter(self.x[idx][fading], self.y[idx][fading],
+                       s=size[fading] * 2, c=glow_rgba, zorder=6)
+
+class LevelOfDetail:
+    """Adaptive level of detail for live previews
+
+    Tracks an exponential moving average of the measured frame time and
+    steps down (fewer particles, no glow, no flicker) while it exceeds the
+    frame budget, stepping back up once there is comfortable headroom.
+    """
+
+    # (particle scale, glow pass, flicker)
+    LEVELS = [
+        (1.0, True, True),
+        (0.6, True, True),
+        (0.4, False, True),
+        (0.25, False, False),
+    ]
+
+    def __init__(self, budget_ms=50, enabled=True, smoothing=0.2, cooldown=10):
+        self.budget = budget_ms / 1000.0
+        self.enabled = enabled
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.level = 0
+        self.frame_time = None
+        self._frames_since_change = 0
+
+    def record(self, seconds):
+        """Feed one measured frame time and adapt the level if needed"""
+        if self.frame_time is None:
+            self.frame_time = seconds
+        else:
+            self.frame_time += self.smoothing * (seconds - self.frame_time)
+
+        self._frames_since_change += 1
+        if not self.enabled or self._frames_since_change < self.cooldown:
+            return
+
+        if self.frame_time > self.budget and self.level < len(self.LEVELS) - 1:
+            self.level += 1
+            self._frames_since_change = 0
+        elif self.frame_time < 0.6 * self.budget and self.level > 0:
+            self.level -= 1
+            self._frames_since_change = 0
+
+    @property
+    def particle_scale(self):
+        return self.LEVELS[self.level][0] if self.enabled else 1.0
+
+    @property
+    def glow(self):
+        return self.LEVELS[self.level][1] if self.enabled else True
+
+    @property
+    def flicker(self):
+        return self.LEVELS[self.level][2] if self.enabled else True
+
+def canvas_writer(**kwargs):
+    """CanvasBufferWriter from the sibling hk_canvas_writer module"""
+    from hk_canvas_writer import CanvasBufferWriter
+    return CanvasBufferWriter(**kwargs)
+
+def gif_header(width, height, loop=0):
+    """GIF89a header without a global palette, plus a NETSCAPE loop extension"""
+    return (b'GIF89a' + struct.pack('<HHBBB', width, height, 0, 0, 0)
+            + b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', loop) + b'\x00')
+
+def encode_gif_frame(rgb, previous=None, duration=50):
+    """Encode an RGB frame as a self-contained GIF frame block
+    
+    Only the rectangle that changed since ``previous`` is stored, with its own
+    adaptive palette, so blocks can be concatenated after a gif_header() and
+    the result stays valid when blocks are replaced or appended later.
+    """
+    if previous is None:
+        top, bottom, left, right = 0, rgb.shape[0], 0, rgb.shape[1]
+    else:
+        changed = np.any(rgb != previous, axis=2)
+        rows = np.flatnonzero(changed.any(axis=1))
+        cols = np.flatnonzero(changed.any(axis=0))
+        if len(rows) == 0:
+            # Nothing changed: keep the frame (and its timing) with a 1x1 update
+            top, bottom, left, right = 0, 1, 0, 1
+        else:
+            top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    
+    region = Image.fromarray(np.ascontiguousarray(rgb[top:bottom, left:right]))
+    region = region.convert('P', palette=Image.Palette.ADAPTIVE)
+    # Disposal 1: leave the frame in place for the next delta to draw over
+    blocks = GifImagePlugin.getdata(region, offset=(int(left), int(top)), duration=duration,
+                                    disposal=1, include_color_table=True)
+    return b''.join(blocks)
+
 class HKUnemploymentCurveAnimator:
-    def __init__(self, csv_file="hk_labor_enhanced.csv"):
+    BACKENDS = ('matplotlib', 'raster')
+    CHECKPOINT_INTERVAL = 10  # frames between checkpoints in render_frames()
+    
+    def __init__(self, csv_file="hk_labor_enhanced.csv", max_particles=1024, seed=None, df=None,
+                 backend='matplotlib'):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {self.BACKENDS}")
         self.csv_file = csv_file
+        self.backend = backend
+        self._raster = None
         self.df = None
-        self.particles = []
+        self.particles = ParticlePool(max_particles)
+        self.rng = np.random.default_rng(seed)
+        self.lod = LevelOfDetail(enabled=False)
         self.fig = None
         self.ax = None
+        self._frame_start = None
+        self._static_artists = None
+        
+        if df is not None:
+            # Share already-loaded data instead of reading the CSV again
+            self.df = df
+            self.prepare()
+        else:
+            # Try to load data
+            self.load_data()
+        
+    def prepare(self):
+        """Precompute per-month arrays used by every frame"""
+        rates = self.df['失业率_百分比'].to_numpy(dtype=float)
+        counts = np.arange(1, len(rates) + 1)
+        self._x = self.df['月份索引'].to_numpy(dtype=float)
+        self._y = rates
+        self._cummax = np.maximum.accumulate(rates)
+        self._cummin = np.minimum.accumulate(rates)
+        self._cummean = np.cumsum(rates) / counts
+        self._rising = np.concatenate([[False], rates[1:] > rates[:-1]])
+        self._month_labels = self.df['年月'].dt.strftime('%Y-%m').tolist()
+        self._title_labels = self.df['年月'].dt.strftime('%Y年%m月').tolist()
+    
+    def subset(self, start=None, end=None, **kwargs):
+        """Return an animator over a date range (inclusive 'YYYY-MM' bounds), sharing loaded data"""
+        df = self.df
+        if start is not None:
+            df = df[df['年月'] >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df['年月'] <= pd.Timestamp(end)]
+        if len(df) == 0:
+            raise ValueError(f"No data between {start} and {end}")
         
-        # Try to load data
-        self.load_data()
+        df = df.reset_index(drop=True)
+        df['月份索引'] = range(len(df))
+        kwargs.setdefault('backend', self.backend)
+        return HKUnemploymentCurveAnimator(self.csv_file, self.particles.capacity, df=df, **kwargs)
         
     def load_data(self):
         """Load CSV data"""
-        import os
-        
         # Try multiple possible paths
         possible_paths = [
             self.csv_file,  # Current directory
@@ -56,6 +308,7 @@ class HKUnemploymentCurveAnimator:
                     self.df = pd.read_csv(path)
                     self.df['年月'] = pd.to_datetime(self.df['年月'])
                     self.df['月份索引'] = range(len(self.df))
+                    self.prepare()
                     print(f"✅ Successfully loaded data: {len(self.df)} rows")
                     print(f"Unemployment rate range: {self.df['失业率_百分比'].min():.1f}% - {self.df['失业率_百分比'].max():.1f}%")
                     print(f"Time range: {self.df['年月'].min().strftime('%Y-%m')} to {self.df['年月'].max().strftime('%Y-%m')}")
@@ -95,36 +348,26 @@ class HKUnemploymentCurveAnimator:
         
         # Particle count increases with unemployment rate
         n_particles = int(20 + explosion_intensity * 30)
-        
-        # Create explosion particles
-        for i in range(n_particles):
-            # 径向分布
-            angle = (i / n_particles) * 2 * np.pi
-            radius = np.random.uniform(0.5, 3.0) * explosion_intensity
-            
-            # Particle initial position and velocity
-            particle_x = x + radius * np.cos(angle) * 0.5
-            particle_y = y + radius * np.sin(angle) * 0.2
-            
-            # 径向速度
-            speed = np.random.uniform(0.3, 1.5) * explosion_intensity
-            vx = speed * np.cos(angle)
-            vy = speed * np.sin(angle)
-            
-            # Particle properties
-            particle = {
-                'x': particle_x,
-                'y': particle_y,
-                'vx': vx,
-                'vy': vy,
-                'life': 1.0,
-                'max_life': 1.0,
-                'size': np.random.uniform(20, 60) * explosion_intensity,
-                'color': self.get_explosion_color(unemployment_rate, i / n_particles),
-                'birth_frame': frame
-            }
-            self.particles.append(particle)
-    
+        n_particles = max(1, int(n_particles * self.lod.particle_scale))
+
+        # 径向分布
+        ratio = np.arange(n_particles) / n_particles
+        angle = ratio * 2 * np.pi
+        radius = self.rng.uniform(0.5, 3.0, n_particles) * explosion_intensity
+
+        # 径向速度
+        speed = self.rng.uniform(0.3, 1.5, n_particles) * explosion_intensity
+
+        colors = [self.get_explosion_color(unemployment_rate, r) for r in ratio]
+        self.particles.spawn(
+            x + radius * np.cos(angle) * 0.5,
+            y + radius * np.sin(angle) * 0.2,
+            speed * np.cos(angle),
+            speed * np.sin(angle),
+            self.rng.uniform(20, 60, n_particles) * explosion_intensity,
+            np.array([to_rgb(c) for c in colors]),
+        )
+
     def get_explosion_color(self, unemployment_rate, position_ratio):
         """Get explosion color based on unemployment rate and position"""
         if unemployment_rate < 3.2:
@@ -143,50 +386,10 @@ class HKUnemploymentCurveAnimator:
     
     def update_particles(self):
         """Update particle system - Enhanced explosion effects"""
-        active_particles = []
-        
-        for particle in self.particles:
-            # Update position
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            
-            # Update life value
-            particle['life'] -= 0.015  # Slightly slower dissipation
-            
-            # Physics effects
-            particle['vy'] -= 0.008  # Light gravity
-            particle['vx'] *= 0.99   # Air resistance
-            particle['vy'] *= 0.99
-            
-            # Only keep alive particles
-            if particle['life'] > 0:
-                # Calculate transparency and size
-                life_ratio = particle['life'] / particle['max_life']
-                alpha = life_ratio * 0.8  # Transparency decreases with life
-                size = particle['size'] * (0.5 + 0.5 * life_ratio)  # Size decreases with life
-                
-                # 添加闪烁效果
-                flicker = 0.8 + 0.2 * np.random.random()
-                alpha *= flicker
-                
-                # Draw particle
-                self.ax.scatter(particle['x'], particle['y'], 
-                               s=size, c=particle['color'], 
-                               alpha=alpha, zorder=7, 
-                               edgecolors='white', linewidth=0.5)
-                
-                # 为即将消失的粒子添加光晕效果
-                if life_ratio < 0.3:
-                    glow_size = size * 2
-                    glow_alpha = alpha * 0.3
-                    self.ax.scatter(particle['x'], particle['y'], 
-                                   s=glow_size, c='white', 
-                                   alpha=glow_alpha, zorder=6)
-                
-                active_particles.append(particle)
-        
-        self.particles = active_particles
-    
+        self.particles.step()
+        self.particles.draw(self.ax, self.rng,
+                            flicker=self.lod.flicker, glow=self.lod.glow)
+
     def create_simple_curve_with_explosion(self, frame):
         """创建简化的曲线 + 粒子爆炸效果"""
         if self.df is None or len(self.df) == 0:
@@ -199,9 +402,8 @@ class HKUnemploymentCurveAnimator:
             return
         
         # 基础数据
-        x_data = self.df['月份索引'][:current_point + 1]
-        y_data = self.df['失业率_百分比'][:current_point + 1]
-        dates = self.df['年月'][:current_point + 1]
+        x_data = self._x[:current_point + 1]
+        y_data = self._y[:current_point + 1]
         
         # Draw clean main curve
         self.ax.plot(x_data, y_data, 'cyan', linewidth=3, alpha=0.8, zorder=4)
@@ -211,10 +413,9 @@ class HKUnemploymentCurveAnimator:
         
         # 当前点的爆炸效果
         if current_point > 0:
-            current_x = x_data.iloc[-1]
-            current_y = y_data.iloc[-1]
-            current_rate = y_data.iloc[-1]
-            current_date = dates.iloc[-1]
+            current_x = x_data[-1]
+            current_y = y_data[-1]
+            current_rate = y_data[-1]
             
             # 每5帧创建一次爆炸
             if frame % 5 == 0:
@@ -228,7 +429,7 @@ class HKUnemploymentCurveAnimator:
                            c='red', alpha=pulse_alpha, zorder=6)
             
             # 当前值标注
-            self.ax.annotate(f'{current_y:.1f}%\n{current_date.strftime("%Y-%m")}', 
+            self.ax.annotate(f'{current_y:.1f}%\n{self._month_labels[current_point]}', 
                            xy=(current_x, current_y), 
                            xytext=(15, 25), textcoords='offset points',
                            fontsize=12, fontweight='bold',
@@ -247,7 +448,13 @@ class HKUnemploymentCurveAnimator:
     
     def setup_plot(self):
         """Set up plotting environment"""
+        if self.fig is not None and plt.fignum_exists(self.fig.number):
+            # Reuse the figure (and its static layers) across renders
+            return
+        
         self.fig, self.ax = plt.subplots(figsize=(16, 10))
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self._static_artists = None
         
         # Set dark background
         self.fig.patch.set_facecolor('black')
@@ -293,11 +500,8 @@ class HKUnemploymentCurveAnimator:
                     bbox=dict(boxstyle='round,pad=0.5', facecolor='black', 
                              edgecolor='cyan', alpha=0.8))
     
-    def animate_frame(self, frame):
-        """Animation frame update function"""
-        if self.df is None:
-            return []
-        
+    def draw_static_layers(self, frame=0):
+        """Reset the axes and draw everything that does not change per frame"""
         # Clear canvas content (preserve axes)
         self.ax.clear()
         
@@ -315,20 +519,41 @@ class HKUnemploymentCurveAnimator:
             spine.set_color('white')
             spine.set_linewidth(2)
         
+        # 创建简化背景
+        self.create_simple_background(frame)
+        
+        self._static_artists = set(self.ax.get_children())
+    
+    def reset(self, seed=None):
+        """Clear particles and reseed so the next render starts fresh"""
+        self.particles.clear()
+        self.rng = np.random.default_rng(seed)
+    
+    def animate_frame(self, frame):
+        """Animation frame update function"""
+        if self.df is None:
+            return []
+        
+        self._frame_start = time.perf_counter()
+        
+        if self._static_artists is None:
+            self.draw_static_layers(frame)
+        else:
+            # Remove last frame's dynamic artists, keeping axes and grid
+            for artist in self.ax.get_children():
+                if artist not in self._static_artists:
+                    artist.remove()
+        
         # 当前数据点
         current_point = min(frame // 2, len(self.df) - 1)
-        current_data = self.df.iloc[current_point] if current_point < len(self.df) else self.df.iloc[-1]
         
         # Dynamic title
-        title = f'香港失业率粒子爆炸可视化 - {current_data["年月"].strftime("%Y年%m月")}\n'
-        title += f'当前失业率: {current_data["失业率_百分比"]:.1f}% | 粒子数量: {len(self.particles)}'
+        title = f'香港失业率粒子爆炸可视化 - {self._title_labels[current_point]}\n'
+        title += f'当前失业率: {self._y[current_point]:.1f}% | 粒子数量: {len(self.particles)}'
         
         self.ax.set_title(title, fontsize=16, fontweight='bold', 
                          color='white', pad=20)
         
-        # 创建简化背景
-        self.create_simple_background(frame)
-        
         # 创建简化曲线和粒子爆炸
         self.create_simple_curve_with_explosion(frame)
         
@@ -338,10 +563,10 @@ class HKUnemploymentCurveAnimator:
         # 添加统计信息
         if current_point > 0:
             stats_text = f"""当前统计:
-最大值: {self.df['失业率_百分比'][:current_point+1].max():.1f}%
-最小值: {self.df['失业率_百分比'][:current_point+1].min():.1f}%
-平均值: {self.df['失业率_百分比'][:current_point+1].mean():.2f}%
-变化趋势: {"📈" if current_point > 0 and self.df.iloc[current_point]['失业率_百分比'] > self.df.iloc[current_point-1]['失业率_百分比'] else "📉"}"""
+最大值: {self._cummax[current_point]:.1f}%
+最小值: {self._cummin[current_point]:.1f}%
+平均值: {self._cummean[current_point]:.2f}%
+变化趋势: {"📈" if self._rising[current_point] else "📉"}"""
             
             self.ax.text(0.98, 0.98, stats_text, transform=self.ax.transAxes,
                         fontsize=10, color='yellow', va='top', ha='right',
@@ -370,28 +595,293 @@ class HKUnemploymentCurveAnimator:
         
         return anim
     
+    def _on_draw(self, event):
+        """Measure frame time (update + render) for the level-of-detail controller"""
+        if self._frame_start is not None:
+            self.lod.record(time.perf_counter() - self._frame_start)
+            self._frame_start = None
+    
+    def prepare_render(self, dpi=100):
+        """Set up the active backend for rendering frames at ``dpi``"""
+        if self.backend == 'raster':
+            if self._raster is None or self._raster.dpi != dpi:
+                from hk_unemployment_raster import CurveRasterizer
+                self._raster = CurveRasterizer(self, dpi)
+        else:
+            self.setup_plot()
+            self.fig.set_dpi(dpi)
+    
+    def frame_size(self):
+        """(width, height) in pixels of frames from render_frame_array()"""
+        if self.backend == 'raster':
+            return self._raster.width, self._raster.height
+        return self.fig.canvas.get_width_height()
+    
+    def render_frame_array(self, frame):
+        """Advance the animation by one frame and return it as an HxWx3 uint8 array
+        
+        The returned array may be a view of a reused buffer; copy it to keep it.
+        """
+        if self.backend == 'matplotlib':
+            self.animate_frame(frame)
+            self.fig.canvas.draw()
+            return np.asarray(self.fig.canvas.buffer_rgba())[..., :3]
+        
+        # Same simulation order as animate_frame(): title count, explosion, step
+        current_point = min(frame // 2, len(self.df) - 1)
+        particle_count = len(self.particles)
+        if current_point >= 1 and frame % 5 == 0:
+            rate = self._y[current_point]
+            self.create_particle_explosion(self._x[current_point], rate, rate, frame)
+        self.particles.step()
+        return self._raster.render(frame, current_point, particle_count, self.particles,
+                                   self.rng, flicker=self.lod.flicker, glow=self.lod.glow)
+    
+    def finish_render(self):
+        """Release per-render backend resources"""
+        if self.backend == 'matplotlib' and self.fig is not None:
+            plt.close(self.fig)
+            self.fig = self.ax = None
+    
     def save_animation(self, filename="hk_unemployment_dynamic_curve.gif", 
                       fps=20, dpi=100):
         """Save animation as GIF"""
+        if self.backend == 'raster':
+            return self._save_animation_raster(filename, fps, dpi)
+        
         print("Starting to create dynamic curve animation...")
         anim = self.create_animation(interval=1000//fps)
         
         if anim is None:
             return None
         
+        # Exports always render at full detail
+        self.lod.enabled = False
+        
         print("Saving animation...")
-        writer = PillowWriter(fps=fps)
+        # Encodes the canvas each frame was just drawn to, instead of re-rendering it
+        writer = canvas_writer(fps=fps)
         anim.save(filename, writer=writer, dpi=dpi)
-        print(f"Animation saved as: {filename}")
+        print(f"Animation saved as: {filename} "
+              f"(encoded {writer.frame_bytes / 1e6:.0f} MB at {writer.throughput:.1f} MB/s)")
         
         return anim
     
+    def render_gif(self, fps=20, dpi=100):
+        """Encoded GIF bytes, rendered in memory without touching the disk"""
+        if self.df is None:
+            return None
+        
+        buf = io.BytesIO()
+        if self.backend == 'raster':
+            self._write_gif_raster(buf, fps, dpi)
+        else:
+            anim = self.create_animation(interval=1000//fps)
+            self.lod.enabled = False
+            anim.save(buf, writer=canvas_writer(fps=fps, format='gif'), dpi=dpi)
+            self.finish_render()
+        return buf.getvalue()
+    
+    def data_fingerprint(self, months=None):
+        """Hash of the data (optionally its first ``months`` rows), used to validate checkpoints"""
+        df = self.df if months is None else self.df.iloc[:months]
+        values = df[['年月', '失业率_百分比']].to_csv(index=False)
+        return hashlib.sha256(values.encode('utf-8')).hexdigest()
+    
+    def _write_checkpoint(self, scratch_dir, completed, previous, name='state.npz'):
+        """Atomically persist particle/RNG state and the last frame after ``completed`` frames"""
+        path = os.path.join(scratch_dir, name)
+        tmp = path + '.tmp.npz'
+        if previous is None:
+            # An empty frame rather than None, which would be pickled and refused by np.load
+            previous = np.zeros((0, 0, 0), dtype=np.uint8)
+        # The frame is mostly flat background: ~100 KB compressed instead of ~11 MB at dpi 150
+        np.savez_compressed(tmp, completed=completed, previous=previous,
+                 rng=json.dumps(self.rng.bit_generator.state),
+                 **self.particles.state_dict())
+        os.replace(tmp, path)
+    
+    def _read_checkpoint(self, scratch_dir, name='state.npz'):
+        """Restore state from a checkpoint, returning (completed frames, last frame)"""
+        path = os.path.join(scratch_dir, name)
+        if not os.path.exists(path):
+            return 0, None
+        with np.load(path) as state:
+            self.particles.load_state_dict(state)
+            self.rng.bit_generator.state = json.loads(str(state['rng']))
+            previous = state['previous'] if state['previous'].size else None
+            return int(state['completed']), previous
+    
+    def render_frames(self, scratch_dir, fps=20, dpi=100, frames=None, incremental=False):
+        """Render encoded GIF frames to ``scratch_dir``, resuming after interruption
+        
+        Each finished frame is written as a self-contained GIF frame block.
+        Every ``CHECKPOINT_INTERVAL`` frames (and at the end) the particle
+        system, random generator and frame pixels are checkpointed, so a
+        restarted run re-renders at most that many frames from the last
+        checkpoint and produces the same output as an uninterrupted one.
+        
+        The state at the end of the data history (before the tail frames) is
+        kept as well. With ``incremental=True``, a scratch directory rendered
+        from an earlier version of the data whose months are a prefix of the
+        current data is extended from there: only the newly appended months
+        and a new tail are rendered.
+        
+        Returns the list of block paths (GIF header first).
+        """
+        if self.df is None:
+            print("Data not loaded, cannot render frames")
+            return None
+        
+        months = len(self.df)
+        if frames is None:
+            frames = months * 2 + 50  # 多一些帧用于结尾效果
+        
+        os.makedirs(scratch_dir, exist_ok=True)
+        manifest_path = os.path.join(scratch_dir, 'manifest.json')
+        settings = {'fps': fps, 'dpi': dpi, 'max_particles': self.particles.capacity}
+        manifest = dict(settings, frames=frames, months=months, data=self.data_fingerprint())
+        
+        previous_manifest = None
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as fh:
+                previous_manifest = json.load(fh)
+        
+        start, previous = 0, None
+        history_path = os.path.join(scratch_dir, 'history.npz')
+        if previous_manifest == manifest:
+            start, previous = self._read_checkpoint(scratch_dir)
+        elif (previous_manifest is not None and incremental and os.path.exists(history_path)
+              and self._extends(previous_manifest, settings)):
+            # Rewind to the end of the old history and continue with the new months
+            # (only possible once an earlier run got that far and saved history.npz)
+            shutil.copyfile(history_path, os.path.join(scratch_dir, 'state.npz'))
+            start, previous = self._read_checkpoint(scratch_dir)
+            print(f"Extending {previous_manifest['months']} → {months} months, "
+                  f"reusing {start} encoded frames")
+        elif previous_manifest is not None:
+            print("⚠️  Checkpoint was made with different settings, starting over")
+        
+        if start == 0:
+            self.particles.clear()
+            self._write_checkpoint(scratch_dir, 0, None)
+        elif start < frames:
+            print(f"Resuming from frame {start}/{frames}")
+        with open(manifest_path, 'w') as fh:
+            json.dump(manifest, fh)
+        
+        # Checkpointed renders always use full detail so resumed output matches
+        self.lod.enabled = False
+        self.prepare_render(dpi)
+        
+        header_path = os.path.join(scratch_dir, 'header.gif')
+        with open(header_path, 'wb') as fh:
+            fh.write(gif_header(*self.frame_size()))
+        
+        paths = [os.path.join(scratch_dir, f'frame_{i:05d}.gifblk') for i in range(frames)]
+        history_end = months * 2
+        for frame in range(start, frames):
+            rgb = self.render_frame_array(frame).copy()
+            
+            tmp = paths[frame] + '.tmp'
+            with open(tmp, 'wb') as fh:
+                fh.write(encode_gif_frame(rgb, previous, duration=int(1000 / fps)))
+            os.replace(tmp, paths[frame])
+            previous = rgb
+            if (frame + 1) % self.CHECKPOINT_INTERVAL == 0 or frame + 1 == frames:
+                self._write_checkpoint(scratch_dir, frame + 1, rgb)
+            if frame + 1 == history_end:
+                self._write_checkpoint(scratch_dir, frame + 1, rgb, name='history.npz')
+            
+            if (frame + 1) % 50 == 0 or frame + 1 == frames:
+                print(f"  Rendered {frame + 1}/{frames} frames")
+        
+        self.finish_render()
+        return [header_path] + paths
+    
+    def _extends(self, previous_manifest, settings):
+        """Whether a previous render covers a prefix of the current data with the same settings"""
+        old_months = previous_manifest.get('months', 0)
+        return (all(previous_manifest.get(key) == value for key, value in settings.items())
+                and previous_manifest.get('frames') == old_months * 2 + 50
+                and 0 < old_months <= len(self.df)
+                and previous_manifest.get('data') == self.data_fingerprint(old_months))
+    
+    @staticmethod
+    def assemble_gif(block_paths, filename):
+        """Concatenate the header and encoded frame blocks into the final GIF"""
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as out:
+            for path in block_paths:
+                with open(path, 'rb') as fh:
+                    shutil.copyfileobj(fh, out)
+            out.write(b';')  # GIF trailer
+        os.replace(tmp, filename)
+        print(f"Animation saved as: {filename}")
+    
+    def save_animation_resumable(self, filename="hk_unemployment_dynamic_curve.gif",
+                                 fps=20, dpi=100, scratch_dir=None, keep_frames=False,
+                                 incremental=False):
+        """Save animation as GIF via checkpointed frame rendering
+        
+        Interrupting and re-running with the same arguments resumes from the
+        last completed frame instead of starting over. With ``incremental=True``
+        the encoded frames are kept after saving, and a later run on data with
+        newly appended months only renders those months plus the tail.
+        """
+        if scratch_dir is None:
+            scratch_dir = filename + '.frames'
+        
+        print("Starting to render checkpointed animation frames...")
+        paths = self.render_frames(scratch_dir, fps=fps, dpi=dpi, incremental=incremental)
+        if paths is None:
+            return None
+        
+        self.assemble_gif(paths, filename)
+        if not (keep_frames or incremental):
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        return filename
+    
+    def _save_animation_raster(self, filename, fps, dpi):
+        """Save animation as GIF using the NumPy rasterizer, encoding frames as they are drawn"""
+        if self.df is None:
+            print("Data not loaded, cannot create animation")
+            return None
+        
+        start = time.perf_counter()
+        tmp = filename + '.tmp'
+        with open(tmp, 'wb') as out:
+            frames = self._write_gif_raster(out, fps, dpi)
+        os.replace(tmp, filename)
+        
+        elapsed = time.perf_counter() - start
+        print(f"Animation saved as: {filename} ({frames / elapsed:.1f} frames/s)")
+        return filename
+    
+    def _write_gif_raster(self, out, fps, dpi):
+        """Rasterize every frame and write the GIF to ``out``, returning the frame count"""
+        frames = len(self.df) * 2 + 50  # 多一些帧用于结尾效果
+        print(f"Rasterizing animation: {frames} frames")
+        self.lod.enabled = False
+        self.prepare_render(dpi)
+        
+        previous = None
+        out.write(gif_header(*self.frame_size()))
+        for frame in range(frames):
+            rgb = self.render_frame_array(frame)
+            out.write(encode_gif_frame(rgb, previous, duration=int(1000 / fps)))
+            previous = rgb.copy()
+        out.write(b';')  # GIF trailer
+        return frames
+    
     def show_preview(self):
         """Show animation preview"""
         if self.df is None:
             return
         
         print("Showing animation preview...")
+        # Hold the preview frame rate by trading detail for speed when needed
+        self.lod = LevelOfDetail(budget_ms=50, enabled=True)
         anim = self.create_animation(interval=50)
         
         if anim is None:
@@ -399,13 +889,143 @@ class HKUnemploymentCurveAnimator:
         
         plt.show()
 
-def main():
+# Named jobs for batch mode, matching the interactive menu choices
+BATCH_PRESETS = {
+    'high': {'output': 'hk_unemployment_dynamic_curve.gif', 'fps': 15, 'dpi': 150, 'resumable': True},
+    'quick': {'output': 'hk_unemployment_preview.gif', 'fps': 10, 'dpi': 100},
+}
+
+JOB_FIELDS = {'output': str, 'fps': int, 'dpi': int, 'start': str, 'end': str,
+              'seed': int, 'resumable': bool, 'incremental': bool, 'backend': str}
+
+def normalize_job(job):
+    """Validate a batch job dict and fill in defaults"""
+    unknown = set(job) - set(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+    if 'output' not in job:
+        raise ValueError(f"Job has no output filename: {job}")
+    
+    normalized = {'fps': 20, 'dpi': 100, 'start': None, 'end': None,
+                  'seed': None, 'resumable': False, 'incremental': False,
+                  'backend': 'matplotlib'}
+    for key, value in job.items():
+        if isinstance(value, str) and JOB_FIELDS[key] is bool:
+            value = value.lower() in ('1', 'true', 'yes')
+        elif value is not None:
+            value = JOB_FIELDS[key](value)
+        normalized[key] = value
+    
+    # Checked here so a bad job fails the batch before anything is rendered
+    for key in ('fps', 'dpi'):
+        if normalized[key] is None or normalized[key] <= 0:
+            raise ValueError(f"Job {normalized['output']}: {key} must be a positive integer, "
+                             f"got {normalized[key]}")
+    if normalized['backend'] not in HKUnemploymentCurveAnimator.BACKENDS:
+        raise ValueError(f"Job {normalized['output']}: unknown backend {normalized['backend']!r}, "
+                         f"expected one of {HKUnemploymentCurveAnimator.BACKENDS}")
+    return normalized
+
+def parse_job_spec(spec):
+    """Parse a command line job such as 'output=a.gif,fps=10,dpi=80,start=2018-01'"""
+    job = {}
+    for item in spec.split(','):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value in job spec, got '{item}'")
+        job[key.strip()] = value.strip()
+    return job
+
+def load_manifest(path):
+    """Load a JSON or YAML job list (either a list or {'jobs': [...]})"""
+    with open(path, encoding='utf-8') as fh:
+        if path.endswith(('.yml', '.yaml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("PyYAML is required for YAML manifests: pip install pyyaml")
+            manifest = yaml.safe_load(fh)
+        else:
+            manifest = json.load(fh)
+    
+    jobs = manifest.get('jobs', []) if isinstance(manifest, dict) else manifest
+    if not isinstance(jobs, list):
+        raise ValueError(f"Manifest {path} does not contain a job list")
+    return jobs
+
+def run_batch(jobs, csv_file="hk_labor_enhanced.csv"):
+    """Render several animations in one process
+    
+    The CSV is loaded once; animators (with their precomputed arrays and
+    figure with static layers) are shared by all jobs over the same date
+    range and backend. Returns one result dict per job including its render time.
+    """
+    jobs = [normalize_job(job) for job in jobs]
+    base = HKUnemploymentCurveAnimator(csv_file)
+    if base.df is None:
+        print("❌ Data loading failed, batch aborted")
+        return []
+    
+    animators = {(None, None, base.backend): base}
+    results = []
+    batch_start = time.perf_counter()
+    
+    for n, job in enumerate(jobs, 1):
+        key = (job['start'], job['end'], job['backend'])
+        if key not in animators:
+            animators[key] = base.subset(job['start'], job['end'], backend=job['backend'])
+        animator = animators[key]
+        animator.reset(job['seed'])
+        
+        date_range = f"{animator._month_labels[0]} to {animator._month_labels[-1]}"
+        print(f"\n[{n}/{len(jobs)}] {job['output']}: fps={job['fps']} dpi={job['dpi']} ({date_range})")
+        
+        job_start = time.perf_counter()
+        if job['resumable'] or job['incremental']:
+            animator.save_animation_resumable(job['output'], fps=job['fps'], dpi=job['dpi'],
+                                              incremental=job['incremental'])
+        else:
+            animator.save_animation(job['output'], fps=job['fps'], dpi=job['dpi'])
+        elapsed = time.perf_counter() - job_start
+        
+        print(f"[{n}/{len(jobs)}] ✅ {job['output']} done in {elapsed:.1f}s")
+        results.append(dict(job, seconds=elapsed))
+    
+    print(f"\n📋 Batch summary ({time.perf_counter() - batch_start:.1f}s total):")
+    for result in results:
+        print(f"  {result['seconds']:7.1f}s  {result['output']}")
+    return results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Hong Kong unemployment particle explosion animation. "
+                    "Without arguments an interactive menu is shown.")
+    parser.add_argument('--manifest', help="JSON/YAML file with a list of render jobs")
+    parser.add_argument('--job', action='append', default=[], metavar='SPEC',
+                        help="Render job as key=value pairs, e.g. "
+                             "'output=a.gif,fps=10,dpi=80,start=2018-01,end=2020-12' (repeatable)")
+    parser.add_argument('--preset', action='append', default=[], choices=sorted(BATCH_PRESETS),
+                        help="Add a predefined job (repeatable)")
+    parser.add_argument('--csv', default="hk_labor_enhanced.csv", help="Input CSV file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main function"""
+    args = parse_args(argv)
+    
+    jobs = [dict(BATCH_PRESETS[name]) for name in args.preset]
+    jobs += [parse_job_spec(spec) for spec in args.job]
+    if args.manifest:
+        jobs += load_manifest(args.manifest)
+    if jobs:
+        run_batch(jobs, csv_file=args.csv)
+        return
+    
     print("💥 香港失业率粒子爆炸可视化")
     print("=" * 40)
     
     # Create animator
-    animator = HKUnemploymentCurveAnimator()
+    animator = HKUnemploymentCurveAnimator(args.csv)
     
     if animator.df is None:
         print("❌ Data loading failed, program exiting")
@@ -428,7 +1048,8 @@ def main():
     if choice == "1":
         print("\n🎬 Creating high-quality GIF animation...")
         print("⚠️  This may take a few minutes...")
-        animator.save_animation("hk_unemployment_dynamic_curve.gif", fps=15, dpi=150)
+        print("💾 Progress is checkpointed; re-run to resume if interrupted")
+        animator.save_animation_resumable("hk_unemployment_dynamic_curve.gif", fps=15, dpi=150)
         print("✅ High-quality animation creation completed!")
         
     elif choice == "2":
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+NumPy/Pillow rasterizer for the unemployment particle explosion animation
+
+Draws the same scene as the matplotlib path of HKUnemploymentCurveAnimator
+(curve, data points, pulse, particles with glow, annotation and statistics)
+straight into a preallocated float32 RGB buffer (in 0-255 units, so the
+final frame is a single cast). Discs are alpha-composited
+in one vectorized pass per layer; Pillow is only used to rasterize text,
+and text masks are cached by content.
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from matplotlib import font_manager
+from matplotlib.colors import to_rgb
+
+# Figure layout of the matplotlib path (figsize and default subplot margins)
+FIGSIZE = (16, 10)
+MARGINS = {'left': 0.125, 'right': 0.9, 'bottom': 0.11, 'top': 0.88}
+XLIM = (-5, 135)
+YLIM = (3.0, 4.5)
+
+# Colours in buffer units (0-255)
+WHITE = np.array([255.0, 255.0, 255.0], dtype=np.float32)
+BLACK = np.zeros(3, dtype=np.float32)
+CYAN = np.array(to_rgb('cyan'), dtype=np.float32) * 255
+RED = np.array(to_rgb('red'), dtype=np.float32) * 255
+YELLOW = np.array(to_rgb('yellow'), dtype=np.float32) * 255
+GRAY = np.array(to_rgb('gray'), dtype=np.float32) * 255
+
+
+class CurveRasterizer:
+    """Render animator frames into a NumPy buffer without matplotlib artists"""
+
+    def __init__(self, animator, dpi=100):
+        self.animator = animator
+        self.dpi = dpi
+        self.width = int(round(FIGSIZE[0] * dpi))
+        self.height = int(round(FIGSIZE[1] * dpi))
+        self.pt = dpi / 72.0  # pixels per point
+
+        self.ax_left = MARGINS['left'] * self.width
+        self.ax_right = MARGINS['right'] * self.width
+        self.ax_top = (1 - MARGINS['top']) * self.height
+        self.ax_bottom = (1 - MARGINS['bottom']) * self.height
+
+        # Pixel bounds of the axes: data artists are clipped to them
+        self.clip = (int(round(self.ax_left)), int(round(self.ax_top)),
+                     int(round(self.ax_right)), int(round(self.ax_bottom)))
+
+        # Preallocated buffers reused for every frame: static background,
+        # base (background plus the curve drawn so far) and the frame itself
+        self.background = np.zeros((self.height, self.width, 3), dtype=np.float32)
+        self.base = self.background.copy()
+        self.buffer = np.empty_like(self.background)
+        self.output = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self._flat = self.buffer.reshape(-1, 3)
+
+        # Incrementally built curve layers: line coverage (with the indices it
+        # touches) and premultiplied RGBA data point discs
+        self._line_cov = np.zeros(self.height * self.width, dtype=np.float32)
+        self._line_idx = np.zeros(0, dtype=np.int64)
+        self._points = np.zeros((self.height * self.width, 4), dtype=np.float32)
+        self._points_idx = np.zeros(0, dtype=np.int64)
+        self._curve_points = 0
+
+        self._fonts = {}
+        self._text_cache = {}
+        self._draw_static_background()
+
+    # ------------------------------------------------------------------
+    # Coordinates and text
+    # ------------------------------------------------------------------
+    def to_pixels(self, x, y):
+        """Data coordinates to (fractional) pixel coordinates"""
+        px = self.ax_left + (np.asarray(x) - XLIM[0]) / (XLIM[1] - XLIM[0]) * (self.ax_right - self.ax_left)
+        py = self.ax_bottom - (np.asarray(y) - YLIM[0]) / (YLIM[1] - YLIM[0]) * (self.ax_bottom - self.ax_top)
+        return px, py
+
+    def marker_radius(self, s):
+        """Scatter marker area (points^2) to disc radius in pixels"""
+        return np.sqrt(np.asarray(s, dtype=np.float32)) * self.pt / 2
+
+    def _font(self, size_pt, bold=False):
+        key = (size_pt, bold)
+        if key not in self._fonts:
+            prop = font_manager.FontProperties(family='sans-serif',
+                                               weight='bold' if bold else 'normal')
+            path = font_manager.findfont(prop)
+            self._fonts[key] = ImageFont.truetype(path, max(1, int(round(size_pt * self.pt))))
+        return self._fonts[key]
+
+    def text_mask(self, text, size_pt, bold=False, rotate=False, align='center'):
+        """Coverage mask (float32, 0-1) of a possibly multi-line string"""
+        key = (text, size_pt, bold, rotate, align)
+        mask = self._text_cache.get(key)
+        if mask is None:
+            font = self._font(size_pt, bold)
+            probe = ImageDraw.Draw(Image.new('L', (1, 1)))
+            left, top, right, bottom = probe.multiline_textbbox((0, 0), text, font=font, align=align)
+            left, top = int(np.floor(left)), int(np.floor(top))
+            size = (max(1, int(np.ceil(right)) - left), max(1, int(np.ceil(bottom)) - top))
+            image = Image.new('L', size, 0)
+            ImageDraw.Draw(image).multiline_text((-left, -top), text, font=font, fill=255, align=align)
+            if rotate:
+                image = image.transpose(Image.Transpose.ROTATE_90)
+            mask = np.asarray(image, dtype=np.float32) / 255.0
+            if len(self._text_cache) > 2048:
+                self._text_cache.clear()
+            self._text_cache[key] = mask
+        return mask
+
+    # ------------------------------------------------------------------
+    # Primitive compositing
+    # ------------------------------------------------------------------
+    def _blend_mask(self, target, mask, left, top, rgb, alpha=1.0):
+        """Composite a solid colour through ``mask`` placed at (left, top)"""
+        left, top = int(round(left)), int(round(top))
+        h, w = mask.shape
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + w, self.width), min(top + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        m = mask[y0 - top:y1 - top, x0 - left:x1 - left, None] * alpha
+        region = target[y0:y1, x0:x1]
+        region *= 1 - m
+        region += m * rgb
+
+    def _fill_rect(self, target, x0, y0, x1, y1, rgb, alpha=1.0):
+        x0, y0 = max(int(round(x0)), 0), max(int(round(y0)), 0)
+        x1, y1 = min(int(round(x1)), self.width), min(int(round(y1)), self.height)
+        if x0 < x1 and y0 < y1:
+            region = target[y0:y1, x0:x1]
+            region *= 1 - alpha
+            region += alpha * rgb
+
+    def _box(self, target, x0, y0, x1, y1, face, face_alpha, edge, edge_width):
+        """Filled box with an opaque border (text bbox patches)"""
+        self._fill_rect(target, x0, y0, x1, y1, face, face_alpha)
+        if edge is not None:
+            e = max(1, int(round(edge_width)))
+            self._fill_rect(target, x0, y0, x1, y0 + e, edge)
+            self._fill_rect(target, x0, y1 - e, x1, y1, edge)
+            self._fill_rect(target, x0, y0, x0 + e, y1, edge)
+            self._fill_rect(target, x1 - e, y0, x1, y1, edge)
+
+    def _disc_coverage(self, cx, cy, radius, edge_width=0.0):
+        """Vectorized antialiased disc (and edge ring) coverage for many discs
+
+        Returns flat pixel indices plus fill and ring coverage, each shaped
+        (n_discs, k, k), with pixels outside the axes given zero coverage.
+        """
+        reach = int(np.ceil(radius.max() + edge_width)) + 1
+        offsets = np.arange(-reach, reach + 1)
+        icx = np.floor(cx).astype(np.int64)
+        icy = np.floor(cy).astype(np.int64)
+        px = icx[:, None] + offsets[None, :]
+        py = icy[:, None] + offsets[None, :]
+        dx = (px + 0.5 - cx[:, None]).astype(np.float32)
+        dy = (py + 0.5 - cy[:, None]).astype(np.float32)
+        dist = np.sqrt(dy[:, :, None] ** 2 + dx[:, None, :] ** 2)
+
+        fill = np.clip(radius[:, None, None] - dist + 0.5, 0, 1)
+        if edge_width:
+            ring = np.clip(radius[:, None, None] + edge_width - dist + 0.5, 0, 1) - fill
+        else:
+            ring = None
+
+        x0, y0, x1, y1 = self.clip
+        inside = ((py >= y0) & (py < y1))[:, :, None] & ((px >= x0) & (px < x1))[:, None, :]
+        index = (np.clip(py, 0, self.height - 1)[:, :, None] * self.width
+                 + np.clip(px, 0, self.width - 1)[:, None, :])
+        fill *= inside
+        if ring is not None:
+            ring *= inside
+        return index, fill, ring
+
+    def composite_discs(self, flat, cx, cy, radius, rgb, alpha,
+                        edge_width=0.0, edge_rgb=None, edge_alpha=None):
+        """Alpha-composite many discs into ``flat`` (pixels × channels) in one vectorized pass
+
+        Overlaps are resolved order-independently: total opacity is the
+        product of the individual transparencies and the colour is the
+        opacity-weighted mean, which matches sequential 'over' blending for
+        discs of similar colour (particles of one explosion).
+        """
+        if len(cx) == 0:
+            return np.zeros(0, dtype=np.int64)
+        index, fill, ring = self._disc_coverage(cx, cy, radius, edge_width)
+        weights = [fill * alpha[:, None, None]]
+        colours = [rgb]
+        if ring is not None:
+            weights.append(ring * (alpha if edge_alpha is None else edge_alpha)[:, None, None])
+            colours.append(np.broadcast_to(edge_rgb, rgb.shape))
+
+        index = np.concatenate([index.ravel()] * len(weights))
+        weight = np.concatenate([w.ravel() for w in weights])
+        colour = np.concatenate([np.repeat(c, w.shape[1] * w.shape[2], axis=0)
+                                 for c, w in zip(colours, weights)])
+        keep = weight > 1e-4
+        index, weight, colour = index[keep], weight[keep], colour[keep]
+        if len(index) == 0:
+            return index
+
+        pixels, inverse = np.unique(index, return_inverse=True)
+        log_transparency = np.bincount(inverse, np.log1p(-np.minimum(weight, 0.999)))
+        total = np.bincount(inverse, weight)
+        coverage = 1 - np.exp(log_transparency)
+        mean = np.stack([np.bincount(inverse, weight * colour[:, c])
+                         for c in range(colour.shape[1])], axis=1)
+        mean /= total[:, None]
+
+        target = flat[pixels]
+        target *= (1 - coverage)[:, None]
+        target += mean * coverage[:, None]
+        flat[pixels] = target
+        return pixels
+
+    def line_coverage(self, xs, ys, width):
+        """Antialiased polyline coverage as (flat pixel indices, coverage)
+
+        The line is stamped with discs every half pixel along all segments
+        at once; overlapping stamps are merged by taking the maximum.
+        """
+        lengths = np.hypot(np.diff(xs), np.diff(ys))
+        steps = np.maximum(2, (lengths * 2).astype(np.int64) + 1)
+        segment = np.repeat(np.arange(len(lengths)), steps)
+        t = np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps)
+        t = t / np.repeat(steps - 1, steps)
+        cx = xs[segment] + (xs[segment + 1] - xs[segment]) * t
+        cy = ys[segment] + (ys[segment + 1] - ys[segment]) * t
+        index, fill, _ = self._disc_coverage(cx, cy, np.full(len(cx), width / 2, dtype=np.float32))
+
+        index, fill = index.ravel(), fill.ravel()
+        keep = fill > 0
+        index, fill = index[keep], fill[keep]
+        order = np.argsort(index, kind='stable')
+        index, fill = index[order], fill[order]
+        starts = np.flatnonzero(np.r_[True, index[1:] != index[:-1]])
+        return index[starts], np.maximum.reduceat(fill, starts)
+
+    # ------------------------------------------------------------------
+    # Static and incremental layers
+    # ------------------------------------------------------------------
+    def _draw_static_background(self):
+        """Axes spines, grid, ticks and labels (drawn once)"""
+        bg = self.background
+        bg[:] = 0.0  # black figure and axes
+
+        grid_w = max(1.0, 0.5 * self.pt)
+        for x in np.arange(0, 130, 20):
+            px, _ = self.to_pixels(x, YLIM[0])
+            self._fill_rect(bg, px - grid_w / 2, self.ax_top, px + grid_w / 2, self.ax_bottom, GRAY, 0.2)
+        for y in np.arange(3.0, 4.5, 0.2):
+            _, py = self.to_pixels(XLIM[0], y)
+            self._fill_rect(bg, self.ax_left, py - grid_w / 2, self.ax_right, py + grid_w / 2, GRAY, 0.2)
+
+        tick_len = 3.5 * self.pt
+        tick_w = max(1.0, 0.8 * self.pt)
+        pad = 3.5 * self.pt
+        label_bottom = self.ax_bottom
+        for x in range(0, 121, 20):
+            px, _ = self.to_pixels(x, YLIM[0])
+            self._fill_rect(bg, px - tick_w / 2, self.ax_bottom, px + tick_w / 2, self.ax_bottom + tick_len, WHITE)
+            mask = self.text_mask(str(x), 12)
+            top = self.ax_bottom + tick_len + pad
+            self._blend_mask(bg, mask, px - mask.shape[1] / 2, top, WHITE)
+            label_bottom = max(label_bottom, top + mask.shape[0])
+        label_left = self.ax_left
+        for y in np.arange(3.0, 4.45, 0.2):
+            _, py = self.to_pixels(XLIM[0], y)
+            self._fill_rect(bg, self.ax_left - tick_len, py - tick_w / 2, self.ax_left, py + tick_w / 2, WHITE)
+            mask = self.text_mask(f'{y:.1f}', 12)
+            left = self.ax_left - tick_len - pad - mask.shape[1]
+            self._blend_mask(bg, mask, left, py - mask.shape[0] / 2, WHITE)
+            label_left = min(label_left, left)
+
+        mask = self.text_mask('时间进度', 14)
+        centre = (self.ax_left + self.ax_right) / 2
+        self._blend_mask(bg, mask, centre - mask.shape[1] / 2, label_bottom + 4 * self.pt, WHITE)
+        mask = self.text_mask('失业率 (%)', 14, rotate=True)
+        middle = (self.ax_top + self.ax_bottom) / 2
+        self._blend_mask(bg, mask, label_left - 4 * self.pt - mask.shape[1], middle - mask.shape[0] / 2, WHITE)
+
+        spine = 2 * self.pt
+        self._box(bg, self.ax_left - spine / 2, self.ax_top - spine / 2,
+                  self.ax_right + spine / 2, self.ax_bottom + spine / 2, WHITE, 0.0, WHITE, spine)
+
+    def _extend_curve(self, current_point):
+        """Grow the cached line and data point layers up to ``current_point``"""
+        if current_point + 1 < self._curve_points:
+            # Frames went backwards (e.g. a repeat): rebuild from scratch
+            self._line_cov[:] = 0
+            self._line_idx = self._line_idx[:0]
+            self._points[:] = 0
+            self._points_idx = self._points_idx[:0]
+            self._curve_points = 0
+
+        start = self._curve_points
+        end = current_point + 1
+        if end <= start:
+            return
+        px, py = self.to_pixels(self.animator._x[:end], self.animator._y[:end])
+        seg_start = max(start - 1, 0)
+        pixels, coverage = self.line_coverage(px[seg_start:end], py[seg_start:end], 3 * self.pt)
+        # Stamps are merged by maximum only, which does not depend on how the
+        # segments were grouped into calls
+        np.maximum.at(self._line_cov, pixels, coverage)
+        self._line_idx = np.union1d(self._line_idx, pixels)
+
+        # Data points: white discs with a 1pt cyan edge (alpha in the 4th channel).
+        # Each disc is composited over the previous ones in turn, so the layer is
+        # the same however the points were split across calls (resumed or
+        # extended renders match a clean one)
+        edge = 1.0 * self.pt
+        radius = np.array([self.marker_radius(30) - edge / 2], dtype=np.float32)
+        face, edge_rgb, alpha = np.append(WHITE, 1)[None, :], np.append(CYAN, 1), np.ones(1, dtype=np.float32)
+        touched = [self._points_idx]
+        for i in range(start, end):
+            touched.append(self.composite_discs(self._points, px[i:i + 1], py[i:i + 1], radius, face, alpha,
+                                                edge_width=edge, edge_rgb=edge_rgb))
+        self._points_idx = np.unique(np.concatenate(touched))
+        self._curve_points = end
+
+        # Rebuild the base: curve line (alpha 0.8), then the premultiplied points over it
+        np.copyto(self.base, self.background)
+        flat = self.base.reshape(-1, 3)
+        idx = self._line_idx
+        cov = self._line_cov[idx, None] * 0.8
+        flat[idx] = flat[idx] * (1 - cov) + cov * CYAN
+        idx = self._points_idx
+        points = self._points[idx]
+        flat[idx] = flat[idx] * (1 - points[:, 3:]) + points[:, :3]
+
+    # ------------------------------------------------------------------
+    # Frame rendering
+    # ------------------------------------------------------------------
+    def render(self, frame, current_point, particle_count, particles, rng, flicker=True, glow=True):
+        """Render one frame (simulation already advanced) and return HxWx3 uint8"""
+        a = self.animator
+        if current_point >= 1:
+            self._extend_curve(current_point)
+            np.copyto(self.buffer, self.base)
+        else:
+            np.copyto(self.buffer, self.background)
+        flat = self._flat
+
+        if current_point >= 1:
+            # Pulse at the current point
+            cx, cy = self.to_pixels(a._x[current_point], a._y[current_point])
+            pulse_size = 150 + 50 * np.sin(frame * 0.3)
+            pulse_alpha = 0.4 + 0.3 * np.sin(frame * 0.3)
+            # Scatter edges default to the face colour, 1.5pt wide
+            self.composite_discs(flat, np.array([cx]), np.array([cy]),
+                                 np.array([self.marker_radius(pulse_size) + 0.75 * self.pt]),
+                                 RED[None, :], np.array([pulse_alpha], dtype=np.float32))
+
+        # Particles: glow first (zorder 6), then the particles themselves
+        idx, size, alpha = particles.visible(rng, flicker)
+        if len(idx):
+            px, py = self.to_pixels(particles.x[idx], particles.y[idx])
+            radius = self.marker_radius(size)
+            fading = particles.life[idx] < 0.3
+            if glow and fading.any():
+                n = np.count_nonzero(fading)
+                self.composite_discs(flat, px[fading], py[fading],
+                                     radius[fading] * np.sqrt(2) + 0.75 * self.pt,
+                                     np.tile(WHITE, (n, 1)), (alpha[fading] * 0.3).astype(np.float32))
+            edge = 0.5 * self.pt
+            self.composite_discs(flat, px, py, np.maximum(radius - edge / 2, 0),
+                                 (particles.rgb[idx] * 255).astype(np.float32),
+                                 alpha.astype(np.float32), edge_width=edge, edge_rgb=WHITE)
+
+        self._draw_text(current_point, particle_count)
+
+        # All blends are convex combinations, so values stay within [0, 255]
+        self.output[...] = self.buffer
+        return self.output
+
+    def _draw_text(self, current_point, particle_count):
+        a = self.animator
+        buf = self.buffer
+
+        title = f'香港失业率粒子爆炸可视化 - {a._title_labels[current_point]}\n'
+        title += f'当前失业率: {a._y[current_point]:.1f}% | 粒子数量: {particle_count}'
+        mask = self.text_mask(title, 16, bold=True)
+        centre = (self.ax_left + self.ax_right) / 2
+        self._blend_mask(buf, mask, centre - mask.shape[1] / 2,
+                         self.ax_top - 20 * self.pt - mask.shape[0], WHITE)
+
+        if current_point < 1:
+            return
+
+        # Annotation box offset (15, 25) points from the current point
+        cx, cy = self.to_pixels(a._x[current_point], a._y[current_point])
+        mask = self.text_mask(f'{a._y[current_point]:.1f}%\n{a._month_labels[current_point]}', 12,
+                              bold=True, align='left')
+        pad = 0.5 * 12 * self.pt
+        left = cx + 15 * self.pt
+        bottom = cy - 25 * self.pt
+        top = bottom - mask.shape[0]
+        box = (left - pad, top - pad, left + mask.shape[1] + pad, bottom + pad)
+        self._draw_arrow(np.array([box[0], cx]), np.array([box[3], cy]))
+        self._box(buf, *box, YELLOW, 0.9, None, 0)
+        self._blend_mask(buf, mask, left, top, BLACK)
+
+        stats_text = f"""当前统计:
+最大值: {a._cummax[current_point]:.1f}%
+最小值: {a._cummin[current_point]:.1f}%
+平均值: {a._cummean[current_point]:.2f}%
+变化趋势: {"📈" if a._rising[current_point] else "📉"}"""
+        mask = self.text_mask(stats_text, 10, align='right')
+        pad = 0.5 * 10 * self.pt
+        right = self.ax_left + 0.98 * (self.ax_right - self.ax_left)
+        top = self.ax_bottom - 0.98 * (self.ax_bottom - self.ax_top)
+        left = right - mask.shape[1]
+        self._box(buf, left - pad, top - pad, right + pad, top + mask.shape[0] + pad,
+                  BLACK, 0.8, YELLOW, 1.0 * self.pt)
+        self._blend_mask(buf, mask, left, top, YELLOW)
+
+    def _draw_arrow(self, xs, ys):
+        """White annotation arrow from the text box to the point"""
+        pixels, coverage = self.line_coverage(xs, ys, 2 * self.pt)
+        flat = self._flat
+        cov = coverage[:, None]
+        flat[pixels] = flat[pixels] * (1 - cov) + WHITE * cov
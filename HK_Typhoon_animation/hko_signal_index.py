@@ -0,0 +1,277 @@
+import numpy as np
+import pandas as pd
+import argparse
+import hashlib
+import os
+
+# Range-query index over the HKO yearly tropical cyclone warning data.
+# Prefix sums over TotalHours, each signal count and "any signal at level k
+# or higher" give range totals as one subtraction, and a sparse table of
+# argmax indices gives the range maximum from two overlapping power-of-two
+# windows, so every year-range query is O(1) once the index is built.
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hko_tropical_warnings_1956_2024.csv')
+SIGNAL_COLUMNS = ['Signal%d' % k for k in range(1, 9)]
+INDEX_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.index_cache')
+INDEX_VERSION = 1  # bump when the stored arrays change
+
+def prefix_sums(values, previous=None):
+    """Cumulative sums along axis 0 with a leading zero row, continuing ``previous`` if given"""
+    values = np.asarray(values, dtype=float)
+    if previous is None:
+        previous = np.zeros((1,) + values.shape[1:])
+    # Summed on from the last total, so an extended index matches a full rebuild exactly
+    tail = np.cumsum(np.concatenate([previous[-1:], values]), axis=0)
+    return np.concatenate([previous, tail[1:]])
+
+def signal_levels(signals):
+    """Per row and level k, whether any signal of level k or higher was issued"""
+    return signals[:, ::-1].cumsum(axis=1)[:, ::-1] > 0
+
+def extend_sparse_table(table, values, start=0):
+    """Fill sparse-table rows for positions ``start`` onwards (earlier rows are kept)
+
+    ``table[j, i]`` is the index of the maximum of ``values[i:i + 2**j]``
+    (the earliest one on ties), or -1 where that window runs past the end.
+    """
+    n = len(values)
+    levels = max(n, 1).bit_length()
+    grown = np.full((levels, n), -1, dtype=np.int64)
+    old_levels = 0
+    if table is not None:
+        old_levels, old_n = table.shape
+        grown[:old_levels, :old_n] = table
+    grown[0, start:] = np.arange(start, n)
+    for j in range(1, levels):
+        half = 1 << (j - 1)
+        # Windows that end in the new rows begin at most 2**j - 1 positions earlier
+        lo = max(start - (1 << j) + 1, 0) if j < old_levels else 0
+        hi = n - (1 << j) + 1
+        if hi <= lo:
+            continue
+        left = grown[j - 1, lo:hi]
+        right = grown[j - 1, lo + half:hi + half]
+        grown[j, lo:hi] = np.where(values[right] > values[left], right, left)
+    return grown
+
+def frame_arrays(df):
+    """(years, signals, hours) arrays of a warning-data frame, as the index stores them"""
+    return (df['Year'].to_numpy(dtype=np.int64), df[SIGNAL_COLUMNS].to_numpy(dtype=np.int64),
+            df['TotalHours'].to_numpy(dtype=float))
+
+class SignalIndex:
+    """Year-range statistics of the HKO warning data in O(1) per query"""
+
+    def __init__(self, years, signals, hours):
+        self.years = np.asarray(years, dtype=np.int64)
+        self.signals = np.asarray(signals, dtype=np.int64).reshape(len(self.years), len(SIGNAL_COLUMNS))
+        self.hours = np.asarray(hours, dtype=float)
+        self._check_years()
+        self._build(0)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(*frame_arrays(df))
+
+    @classmethod
+    def from_csv(cls, csv_path=CSV_PATH):
+        return cls.from_frame(pd.read_csv(csv_path))
+
+    def __len__(self):
+        return len(self.years)
+
+    def _check_years(self):
+        if len(self.years) > 1 and np.any(np.diff(self.years) <= 0):
+            raise ValueError("Years must be strictly increasing")
+        # Consecutive years map to rows by offset; otherwise by binary search
+        self._contiguous = len(self.years) == 0 or self.years[-1] - self.years[0] == len(self.years) - 1
+
+    def _build(self, start):
+        """(Re)build every index for rows ``start`` onwards"""
+        n = len(self.years)
+        if start == 0:
+            self._hours_sum = self._signal_sum = self._level_sum = self._max_table = None
+        self._hours_sum = prefix_sums(self.hours[start:], self._hours_sum)
+        self._signal_sum = prefix_sums(self.signals[start:], self._signal_sum)
+        self._level_sum = prefix_sums(signal_levels(self.signals[start:]), self._level_sum)
+        self._max_table = extend_sparse_table(self._max_table, self.hours, start)
+        # Rank 1 = most warning hours; tied years share the better rank (re-sorted on append)
+        ordered = np.sort(self.hours)
+        self._ranks = n - np.searchsorted(ordered, self.hours, side='right') + 1
+
+    def append(self, years, signals, hours):
+        """Add newer seasons, extending the indexes instead of rebuilding them"""
+        start = len(self.years)
+        years = np.atleast_1d(np.asarray(years, dtype=np.int64))
+        self.years = np.concatenate([self.years, years])
+        self.signals = np.concatenate([self.signals, np.asarray(signals, dtype=np.int64).reshape(len(years), len(SIGNAL_COLUMNS))])
+        self.hours = np.concatenate([self.hours, np.atleast_1d(np.asarray(hours, dtype=float))])
+        self._check_years()
+        self._build(start)
+
+    def is_prefix_of(self, years, signals, hours):
+        """Whether the given rows are exactly these rows followed by newer ones"""
+        n = len(self)
+        return (len(years) >= n and np.array_equal(years[:n], self.years)
+                and np.array_equal(signals[:n], self.signals)
+                and np.array_equal(hours[:n], self.hours))
+
+    def _row(self, year):
+        if self._contiguous:
+            return int(year - self.years[0])
+        return int(np.searchsorted(self.years, year))
+
+    def _bounds(self, start=None, end=None):
+        """Row slice [lo, hi) covering the inclusive year range, clipped to the data"""
+        lo = 0 if start is None else min(max(self._row(start), 0), len(self))
+        if end is None:
+            hi = len(self)
+        elif self._contiguous:
+            hi = min(max(self._row(end) + 1, 0), len(self))
+        else:
+            hi = int(np.searchsorted(self.years, end, side='right'))
+        if hi <= lo:
+            raise ValueError(f"No data between {start} and {end}")
+        return lo, hi
+
+    def total_hours(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        return float(self._hours_sum[hi] - self._hours_sum[lo])
+
+    def mean_hours(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        return float(self._hours_sum[hi] - self._hours_sum[lo]) / (hi - lo)
+
+    def max_hours(self, start=None, end=None):
+        """(year, hours) of the year with the most warning hours in the range"""
+        lo, hi = self._bounds(start, end)
+        j = (hi - lo).bit_length() - 1
+        left, right = self._max_table[j, lo], self._max_table[j, hi - (1 << j)]
+        best = right if self.hours[right] > self.hours[left] else left
+        return int(self.years[best]), float(self.hours[best])
+
+    def signal_counts(self, start=None, end=None):
+        """Times each of Signal1..Signal8 was issued in the range"""
+        lo, hi = self._bounds(start, end)
+        return (self._signal_sum[hi] - self._signal_sum[lo]).astype(np.int64)
+
+    def years_at_level(self, level, start=None, end=None):
+        """Number of years in the range with a signal of ``level`` (1-8) or higher"""
+        if not 1 <= level <= len(SIGNAL_COLUMNS):
+            raise ValueError(f"Signal level must be between 1 and {len(SIGNAL_COLUMNS)}")
+        lo, hi = self._bounds(start, end)
+        return int(self._level_sum[hi, level - 1] - self._level_sum[lo, level - 1])
+
+    def rank(self, year):
+        """Rank of a year by warning hours among all years (1 = most)"""
+        row = self._row(year)
+        if not 0 <= row < len(self) or self.years[row] != year:
+            raise KeyError(year)
+        return int(self._ranks[row])
+
+    def summary(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        max_year, max_hours = self.max_hours(start, end)
+        return {
+            'start': int(self.years[lo]),
+            'end': int(self.years[hi - 1]),
+            'years': hi - lo,
+            'total_hours': self.total_hours(start, end),
+            'mean_hours': self.mean_hours(start, end),
+            'max_year': max_year,
+            'max_hours': max_hours,
+            'signals': dict(zip(SIGNAL_COLUMNS, self.signal_counts(start, end).tolist())),
+            'years_with_signal8': self.years_at_level(8, start, end),
+        }
+
+    def decades(self):
+        """Summary of every decade present, each answered from the index"""
+        first, last = int(self.years[0]), int(self.years[-1])
+        rollup = []
+        for decade in range(first // 10 * 10, last + 1, 10):
+            try:
+                summary = self.summary(max(decade, first), min(decade + 9, last))
+            except ValueError:
+                continue  # no seasons recorded in this decade
+            summary['decade'] = decade
+            rollup.append(summary)
+        return rollup
+
+    def save(self, path, csv_digest=''):
+        tmp_path = '%s.%d.tmp.npz' % (path[:-4] if path.endswith('.npz') else path, os.getpid())
+        np.savez(tmp_path, version=INDEX_VERSION, csv_digest=csv_digest, years=self.years,
+                 signals=self.signals, hours=self.hours, hours_sum=self._hours_sum,
+                 signal_sum=self._signal_sum, level_sum=self._level_sum,
+                 max_table=self._max_table, ranks=self._ranks)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Index stored by save(), with the CSV digest it was built from"""
+        with np.load(path) as data:
+            if int(data['version']) != INDEX_VERSION:
+                raise ValueError("Index cache version mismatch")
+            index = cls.__new__(cls)
+            index.years, index.signals, index.hours = data['years'], data['signals'], data['hours']
+            index._hours_sum, index._signal_sum = data['hours_sum'], data['signal_sum']
+            index._level_sum, index._max_table, index._ranks = data['level_sum'], data['max_table'], data['ranks']
+            digest = str(data['csv_digest'])
+        index._check_years()
+        return index, digest
+
+def load_index(csv_path=CSV_PATH, cache_dir=INDEX_CACHE):
+    """Signal index of a CSV, cached on disk and extended when rows are appended
+
+    The cache entry (one per CSV file name) records the SHA-256 of the CSV it
+    was built from. A matching digest loads the arrays as they are. If the CSV
+    has changed but still starts with the indexed seasons, only the new rows
+    are indexed; any other change rebuilds the index.
+    """
+    with open(csv_path, 'rb') as fp:
+        digest = hashlib.sha256(fp.read()).hexdigest()
+    path = os.path.join(cache_dir, 'signals_%s.npz' % os.path.splitext(os.path.basename(csv_path))[0])
+    cached = None
+    if os.path.exists(path):
+        try:
+            cached, cached_digest = SignalIndex.load(path)
+        except (ValueError, KeyError, OSError):
+            cached = None
+        if cached is not None and cached_digest == digest:
+            return cached
+
+    years, signals, hours = frame_arrays(pd.read_csv(csv_path))
+    if cached is not None and len(years) > len(cached) and cached.is_prefix_of(years, signals, hours):
+        # Only the appended rows are indexed; the cached prefix sums and table are kept
+        n = len(cached)
+        cached.append(years[n:], signals[n:], hours[n:])
+        index = cached
+    else:
+        index = SignalIndex(years, signals, hours)
+    os.makedirs(cache_dir, exist_ok=True)
+    index.save(path, digest)
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Query the HKO tropical cyclone warning index')
+    parser.add_argument('start', nargs='?', type=int, help='first year (default: first in the data)')
+    parser.add_argument('end', nargs='?', type=int, help='last year (default: last in the data)')
+    parser.add_argument('--csv', default=CSV_PATH)
+    parser.add_argument('--decades', action='store_true', help='print a per-decade rollup')
+    parser.add_argument('--rank', type=int, metavar='YEAR', help='rank of a year by warning hours')
+    args = parser.parse_args(argv)
+
+    index = load_index(args.csv)
+    s = index.summary(args.start, args.end)
+    print('%d-%d: %d years, %.1f warning hours (mean %.1f), most in %d (%.1f h), No.8+ in %d years'
+          % (s['start'], s['end'], s['years'], s['total_hours'], s['mean_hours'],
+             s['max_year'], s['max_hours'], s['years_with_signal8']))
+    print('  ' + '  '.join('%s=%d' % item for item in s['signals'].items()))
+    if args.decades:
+        for d in index.decades():
+            print('%ds: %7.1f h, max %d (%.1f h), No.8+ in %d years'
+                  % (d['decade'], d['total_hours'], d['max_year'], d['max_hours'], d['years_with_signal8']))
+    if args.rank is not None:
+        print('%d ranks #%d of %d by warning hours' % (args.rank, index.rank(args.rank), len(index)))
+
+if __name__ == '__main__':
+    main()
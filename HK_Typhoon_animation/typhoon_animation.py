@@ -1,81 +1,78 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.animation import FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+from functools import lru_cache
+import hashlib
+import io
+import json
 import os
-
-# Auto-detect CSV file location
-def find_csv_file():
-    possible_paths = [
-        'hko_tropical_warnings_1956_2024.csv',  # Current directory
-        'HK_Typhoon_animation/hko_tropical_warnings_1956_2024.csv',  # Parent/child
-        '../hko_tropical_warnings_1956_2024.csv',  # Parent directory
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            print(f"Found CSV file at: {path}")
-            return path
-    
-    raise FileNotFoundError("Could not find hko_tropical_warnings_1956_2024.csv")
-
-# Read data
-csv_path = find_csv_file()
-df = pd.read_csv(csv_path)
-intensity = df['TotalHours'].values
-norm = (intensity - intensity.min()) / (intensity.max() - intensity.min())
+import threading
+import time
 
 # Animation params
 W, H = 8, 8  # figure size in inches
 dpi = 100
-fig, ax = plt.subplots(figsize=(W, H), dpi=dpi)
-ax.set_facecolor('white')
-ax.axis('off')
+frames = 80
+fps = 25
 
 # --- Universe-like background (radial gradient + nebula blobs + starfield)
-def create_universe_background(xmin=-400, xmax=400, ymin=-400, ymax=400, res=800, seed=42):
-    import numpy as _np
-    _np.random.seed(seed)
-    xs = _np.linspace(xmin, xmax, res)
-    ys = _np.linspace(ymin, ymax, res)
-    X, Y = _np.meshgrid(xs, ys)
-    R = _np.sqrt((X/ (xmax-xmin))**2 + (Y/ (ymax-ymin))**2)
+# (cx, cy, amp, sigma, hue) of each coloured nebula blob
+NEBULA_BLOBS = ((-150, -50, 0.6, 120, 0.55), (120, 80, 0.45, 160, 0.65), (40, -120, 0.35, 90, 0.48))
+BACKGROUND_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.background_cache')
+BACKGROUND_VERSION = 1  # bump when the formula below changes
+
+def create_universe_background(xmin=-400, xmax=400, ymin=-400, ymax=400, res=800, seed=42, blobs=NEBULA_BLOBS):
+    # float32 throughout; the 2D terms are built from 1D axis vectors
+    # (each Gaussian blob is the outer product of two 1D Gaussians)
+    xs = np.linspace(xmin, xmax, res, dtype=np.float32)
+    ys = np.linspace(ymin, ymax, res, dtype=np.float32)
+    R = np.sqrt((ys[:, None] / (ymax-ymin))**2 + (xs[None, :] / (xmax-xmin))**2)
 
     # base radial gradient (darker at edges)
-    base = 0.08 + 0.6 * _np.exp(-3 * R)
+    base = 0.08 + 0.6 * np.exp(-3 * R)
 
     # add a few colored nebula blobs
-    neb = _np.zeros_like(base)
-    for cx, cy, amp, sigma, hue in [(-150, -50, 0.6, 120, 0.55), (120, 80, 0.45, 160, 0.65), (40, -120, 0.35, 90, 0.48)]:
-        neb += amp * _np.exp(-((X-cx)**2 + (Y-cy)**2) / (2*sigma**2)) * (0.5 + 0.5*hue)
-
-    img = _np.zeros((res, res, 3), dtype=_np.float32)
-    # base color: deep blue -> purple tint
-    img[..., 0] = base * 0.02 + neb * 0.05  # red channel small
-    img[..., 1] = base * 0.12 + neb * 0.12  # green
-    img[..., 2] = base * 0.25 + neb * 0.35  # blue
+    neb = np.zeros_like(base)
+    for cx, cy, amp, sigma, hue in blobs:
+        gx = np.exp(-(xs-cx)**2 / (2*sigma**2))
+        gy = np.exp(-(ys-cy)**2 / (2*sigma**2)) * (amp * (0.5 + 0.5*hue))
+        neb += np.outer(gy, gx)
 
     # add subtle bright core
-    img += _np.expand_dims(0.15 * _np.exp(-R*6), axis=2)
+    core = 0.15 * np.exp(-R*6)
+
+    img = np.empty((res, res, 3), dtype=np.float32)
+    # base color: deep blue -> purple tint
+    img[..., 0] = base * 0.02 + neb * 0.05 + core  # red channel small
+    img[..., 1] = base * 0.12 + neb * 0.12 + core  # green
+    img[..., 2] = base * 0.25 + neb * 0.35 + core  # blue
 
     # clip
-    img = _np.clip(img, 0, 1)
+    np.clip(img, 0, 1, out=img)
     return img
 
-# draw background image and a starfield
-bg_img = create_universe_background(res=900)
-ax.imshow(bg_img, extent=[-400,400,-400,400], origin='lower', zorder=0)
-
-# starfield on zorder 1
-rng = np.random.RandomState(0)
-num_stars = 800
-sx = rng.uniform(-380, 380, num_stars)
-sy = rng.uniform(-380, 380, num_stars)
-ss = rng.uniform(0.3, 2.5, num_stars)
-alphas = rng.uniform(0.3, 1.0, num_stars)
-star_colors = ['#ffffff'] * num_stars
-ax.scatter(sx, sy, s=ss, c=star_colors, alpha=alphas, linewidths=0, zorder=1)
+def universe_background(xmin=-400, xmax=400, ymin=-400, ymax=400, res=800, seed=42,
+                        blobs=NEBULA_BLOBS, cache_dir=BACKGROUND_CACHE):
+    """Background as a uint8 RGB array, cached on disk and memory-mapped
 
+    The cache file is named after a hash of every parameter, so a different
+    resolution, extent, seed or blob list gets its own entry.
+    """
+    params = [BACKGROUND_VERSION, xmin, xmax, ymin, ymax, res, seed, [list(b) for b in blobs]]
+    key = hashlib.sha1(json.dumps(params).encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, 'universe_%s.npy' % key)
+    if not os.path.exists(path):
+        img = create_universe_background(xmin, xmax, ymin, ymax, res, seed, blobs)
+        img = np.rint(img * 255).astype(np.uint8)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp_path, 'wb') as fp:
+            np.save(fp, img)
+        os.replace(tmp_path, path)
+    return np.load(path, mmap_mode='r')
 
 # Raindrops parameters
 raindrops = 300
@@ -85,24 +82,6 @@ phases = np.random.RandomState(1).rand(raindrops) * 2*np.pi
 speeds = 0.5 + np.random.RandomState(2).rand(raindrops) * 2.0
 sizes = 2 + np.random.RandomState(3).rand(raindrops)*6
 
-# Convert to axes coordinates
-center = (0.5, 0.5)
-
-# Create scatter for raindrops
-xs = np.zeros(raindrops)
-ys = np.zeros(raindrops)
-sc = ax.scatter(xs, ys, s=sizes**2, c=np.zeros((raindrops,4)))
-
-# Create spiral background as multiple lines
-lines = []
-for layer in range(6):
-    ln, = ax.plot([], [], lw=8 - layer, alpha=0.25)
-    lines.append(ln)
-
-ax.set_xlim(-400, 400)
-ax.set_ylim(-400, 400)
-ax.set_aspect('equal')
-
 # color blend function
 def color_blend(t):
     # t in [0,1]
@@ -123,45 +102,166 @@ def color_blend(t):
 tvals = np.linspace(0,1,raindrops)
 base_colors = np.array([color_blend(t) for t in tvals])
 
-frames = 80
+# Spiral layers: only their rotation depends on the frame, so each curve is
+# kept in rotated-coordinate form (r*cos, r*sin) and every frame applies one
+# batched rotation to all layers
+spiral_layers = 6
+spiral_points = 800
+layer_idx = np.arange(spiral_layers)
+th2 = np.stack([np.linspace(0, 2*np.pi*(2+li*0.8), spiral_points) for li in layer_idx])
+r2 = 20 + (layer_idx[:, None]*50) * np.exp(0.15*th2) * 0.002
+spiral_cos = r2 * np.cos(th2)
+spiral_sin = r2 * np.sin(th2)
+spiral_spin = 0.03*(layer_idx+1)  # rotation per frame
+spiral_colors = [color_blend(0.2 + li*0.12) for li in layer_idx]
+spiral_alphas = 0.25 + 0.05*layer_idx
+
+class TyphoonScene:
+    """Figure, background and artists of the animation, built once and reused
+
+    Without ``fig``/``ax`` the scene draws on its own Agg canvas, detached
+    from pyplot, so it can live inside a long-running process. The background
+    is cached under ``cache_dir``.
+    """
+
+    def __init__(self, fig=None, ax=None, cache_dir=BACKGROUND_CACHE):
+        if fig is None:
+            fig = Figure(figsize=(W, H), dpi=dpi)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+        self.fig, self.ax = fig, ax
+        self.lock = threading.Lock()
+        ax.set_facecolor('white')
+        ax.axis('off')
+
+        # draw background image and a starfield
+        bg_img = universe_background(res=900, cache_dir=cache_dir)
+        ax.imshow(bg_img, extent=[-400,400,-400,400], origin='lower', zorder=0)
+
+        # starfield on zorder 1
+        rng = np.random.RandomState(0)
+        num_stars = 800
+        sx = rng.uniform(-380, 380, num_stars)
+        sy = rng.uniform(-380, 380, num_stars)
+        ss = rng.uniform(0.3, 2.5, num_stars)
+        alphas = rng.uniform(0.3, 1.0, num_stars)
+        star_colors = ['#ffffff'] * num_stars
+        ax.scatter(sx, sy, s=ss, c=star_colors, alpha=alphas, linewidths=0, zorder=1)
+
+        # Create scatter for raindrops
+        xs = np.zeros(raindrops)
+        ys = np.zeros(raindrops)
+        self.sc = ax.scatter(xs, ys, s=sizes**2, c=np.zeros((raindrops,4)))
+
+        # Create spiral background as multiple lines
+        self.lines = []
+        for layer in range(spiral_layers):
+            ln, = ax.plot([], [], lw=8 - layer, alpha=0.25)
+            ln.set_color(spiral_colors[layer])
+            ln.set_alpha(spiral_alphas[layer])
+            self.lines.append(ln)
+
+        # Per-frame buffers, written in place by update()
+        self.offsets = np.empty((raindrops, 2))
+        self.drop_rgba = np.empty((raindrops, 4))
+        self.drop_rgba[:, :3] = base_colors
+        self.spiral_x = np.empty((spiral_layers, spiral_points))
+        self.spiral_y = np.empty((spiral_layers, spiral_points))
+        self.spiral_tmp = np.empty((spiral_layers, spiral_points))
+
+        ax.set_xlim(-400, 400)
+        ax.set_ylim(-400, 400)
+        ax.set_aspect('equal')
+
+    # Update function
+    def update(self, frame):
+        sc, lines = self.sc, self.lines
+        th = theta + frame*0.12*speeds
+        r = r_base + 30*np.sin(0.5*th + phases) + frame*1.0
+        np.multiply(r, np.cos(th), out=self.offsets[:, 0])
+        np.multiply(r, np.sin(th), out=self.offsets[:, 1])
+        sc.set_offsets(self.offsets)
+        # set sizes and colors
+        # Ensure positive values before power operation to avoid RuntimeWarning
+        wave = np.sin(0.1*frame + phases)
+        size_multiplier = np.abs(0.6 + 0.8*wave)
+        sizes_now = (sizes * size_multiplier)**1.6
+        sc.set_sizes(sizes_now)
+        # alpha modulated
+        np.multiply(wave, 0.4, out=self.drop_rgba[:, 3])
+        self.drop_rgba[:, 3] += 0.6
+        sc.set_facecolors(self.drop_rgba)
+        sc.set_edgecolors(self.drop_rgba)
+
+        # update spiral layers: rotate every layer by its own angle at once
+        angle = frame*spiral_spin
+        cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+        x2, y2, tmp = self.spiral_x, self.spiral_y, self.spiral_tmp
+        np.multiply(spiral_cos, cos, out=x2)
+        np.multiply(spiral_sin, sin, out=tmp)
+        x2 -= tmp
+        np.multiply(spiral_cos, sin, out=y2)
+        np.multiply(spiral_sin, cos, out=tmp)
+        y2 += tmp
+        for ln, x, y in zip(lines, x2, y2):
+            ln.set_data(x, y)
+        return [sc] + lines
+
+    def render_frame(self, frame):
+        """RGB image of one frame (the figure is opaque, and RGB quantizes better for GIF)"""
+        self.update(frame)
+        self.fig.canvas.draw()
+        # Read-only view of the Agg buffer; the RGB conversion is the only copy
+        buf = self.fig.canvas.buffer_rgba()
+        return Image.frombuffer('RGBA', (buf.shape[1], buf.shape[0]), buf, 'raw', 'RGBA', 0, 1).convert('RGB')
+
+@lru_cache(maxsize=None)
+def scene(cache_dir=BACKGROUND_CACHE):
+    return TyphoonScene(cache_dir=cache_dir)
+
+def render_gif(frame_ids=range(frames), fps=fps, stats=None, cache_dir=BACKGROUND_CACHE):
+    """Encoded GIF bytes, built in memory without touching the disk
+
+    The scene (figure, background, starfield) is created on the first call
+    and reused afterwards, so repeat renders skip all of the setup. Each frame
+    is quantized straight from the canvas buffer as soon as it is drawn, so
+    only palette frames are held until the file is written. If a ``stats``
+    dict is given, it is filled with the frame volume and encoding time.
+    """
+    s = scene(cache_dir)
+    images = []
+    encode_seconds = 0.0
+    with s.lock:
+        for f in frame_ids:
+            rgb = s.render_frame(f)
+            start = time.perf_counter()
+            images.append(rgb.convert('P', palette=Image.Palette.ADAPTIVE))
+            encode_seconds += time.perf_counter() - start
+    buf = io.BytesIO()
+    start = time.perf_counter()
+    images[0].save(buf, format='GIF', save_all=True, append_images=images[1:],
+                   duration=int(1000 / fps), loop=0)
+    encode_seconds += time.perf_counter() - start
+    if stats is not None:
+        stats['frame_bytes'] = len(images) * W * H * dpi * dpi * 4
+        stats['encode_seconds'] = encode_seconds
+        stats['throughput'] = stats['frame_bytes'] / 1e6 / encode_seconds
+    return buf.getvalue()
+
+def main(show=True):
+    # Save to GIF
+    out_path = 'cyclone_anim_py.gif'
+    stats = {}
+    with open(out_path, 'wb') as fp:
+        fp.write(render_gif(stats=stats))
+    print('Saved', out_path, '(encoded %.0f MB at %.1f MB/s)' % (stats['frame_bytes'] / 1e6, stats['throughput']))
+
+    # Optionally show
+    if show:
+        fig, ax = plt.subplots(figsize=(W, H), dpi=dpi)
+        preview = TyphoonScene(fig, ax)
+        anim = FuncAnimation(fig, preview.update, frames=frames, interval=40, blit=True)
+        plt.show()
 
-# Update function
-def update(frame):
-    th = theta + frame*0.12*speeds
-    r = r_base + 30*np.sin(0.5*th + phases) + frame*1.0
-    x = r * np.cos(th)
-    y = r * np.sin(th)
-    sc.set_offsets(np.column_stack([x, y]))
-    # set sizes and colors
-    # Ensure positive values before power operation to avoid RuntimeWarning
-    size_multiplier = np.abs(0.6 + 0.8*np.sin(0.1*frame + phases))
-    sizes_now = (sizes * size_multiplier)**1.6
-    sc.set_sizes(sizes_now)
-    # alpha modulated
-    alphas = 0.6 + 0.4*np.sin(0.1*frame + phases)
-    colors = np.concatenate([base_colors, alphas[:,None]], axis=1)
-    sc.set_facecolors(colors)
-    sc.set_edgecolors(colors)
-
-    # update spiral layers
-    for li, ln in enumerate(lines):
-        th2 = np.linspace(0, 2*np.pi*(2+li*0.8), 800)
-        r2 = 20 + (li*50) * np.exp(0.15*th2) * 0.002
-        x2 = r2 * np.cos(th2 + frame*0.03*(li+1))
-        y2 = r2 * np.sin(th2 + frame*0.03*(li+1))
-        ln.set_data(x2, y2)
-        ln.set_color(color_blend(0.2 + li*0.12))
-        ln.set_alpha(0.25+0.05*li)
-    return [sc] + lines
-
-anim = FuncAnimation(fig, update, frames=frames, interval=40, blit=True)
-
-# Save to GIF using PillowWriter
-out_path = 'cyclone_anim_py.gif'
-writer = PillowWriter(fps=25)
-anim.save(out_path, writer=writer)
-print('Saved', out_path)
-
-# Optionally show
 if __name__ == '__main__':
-    plt.show()
+    main()
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the HK_Labor and HK_Typhoon_animation scripts
+
+Runs headless (Agg backend) and offline. Every case runs in its own Python
+process, so import-time work is measured and peak RSS is per case. Cases run
+on the shipped CSVs and on synthetic copies scaled 10x and 100x. The copies
+are built deterministically by tiling the real rows and extending the
+month/year column, so the same scale always gives byte-identical input.
+
+Measured per case (where it applies):
+    import_s     module import, including module-level precomputation
+    load_s       CSV load and derived arrays
+    stats_s      statistics and per-row derived arrays
+    setup_s      renderer setup (canvas, band states, figure and artists)
+    layout_s     raindrop layout for the rendered frames (cyclone only)
+    generate_s   synthetic dataset generation (scraper only)
+    background_s universe background computed without its cache (typhoon only)
+    plot_s       trend chart rendering and saving (analyzer only)
+    fps          frames rendered per second (encoding excluded)
+    encode_s     time to encode the rendered frames
+    particles_ms particle update per frame (curve animation only)
+    peak_rss_mb  peak resident memory of the case's process
+
+Times are the best of ``--repeat`` runs. Results are written as JSON, and
+``--compare BASELINE`` flags metrics that got worse by more than
+``--threshold`` (relative), exiting with status 1 if any did.
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+    python benchmarks/run_benchmarks.py --compare old.json --current new.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import hashlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LABOR_DIR = os.path.join(ROOT, 'HK_Labor')
+TYPHOON_DIR = os.path.join(ROOT, 'HK_Typhoon_animation')
+LABOR_CSV = os.path.join(LABOR_DIR, 'hk_labor_enhanced.csv')
+TYPHOON_CSV = os.path.join(TYPHOON_DIR, 'hko_tropical_warnings_1956_2024.csv')
+
+SCHEMA = 1
+# Whether a larger value is better; any other metric is a cost (lower is better)
+HIGHER_IS_BETTER = {'fps'}
+
+
+# --- Input data -------------------------------------------------------------
+
+def scale_labor(df, scale):
+    """Tile the monthly rows ``scale`` times, continuing the month sequence"""
+    out = pd.concat([df] * scale, ignore_index=True)
+    start = pd.Period(df['年月'].iloc[0], freq='M')
+    out['年月'] = [str(start + i) for i in range(len(out))]
+    return out
+
+def scale_typhoon(df, scale):
+    """Tile the yearly rows ``scale`` times, continuing the year sequence"""
+    out = pd.concat([df] * scale, ignore_index=True)
+    out['Year'] = df['Year'].iloc[0] + np.arange(len(out))
+    return out
+
+def write_datasets(data_dir, scales):
+    """Write the scaled CSVs, returning {scale: {'labor': path, 'typhoon': path}}"""
+    labor = pd.read_csv(LABOR_CSV, encoding='utf-8-sig', dtype={'年月': str})
+    typhoon = pd.read_csv(TYPHOON_CSV)
+    datasets = {}
+    for scale in scales:
+        if scale == 1:
+            datasets[scale] = {'labor': LABOR_CSV, 'typhoon': TYPHOON_CSV}
+            continue
+        paths = {'labor': os.path.join(data_dir, 'hk_labor_enhanced_x%d.csv' % scale),
+                 'typhoon': os.path.join(data_dir, 'hko_tropical_warnings_x%d.csv' % scale)}
+        scale_labor(labor, scale).to_csv(paths['labor'], index=False, encoding='utf-8-sig')
+        scale_typhoon(typhoon, scale).to_csv(paths['typhoon'], index=False)
+        datasets[scale] = paths
+    return datasets
+
+def file_digest(path):
+    with open(path, 'rb') as fp:
+        return hashlib.sha256(fp.read()).hexdigest()[:16]
+
+
+# --- Cases (run inside the child process) -----------------------------------
+
+class Context:
+    """Inputs and timing helpers handed to each case"""
+
+    def __init__(self, labor_csv, typhoon_csv, frames, repeat, dpi):
+        self.labor_csv = labor_csv
+        self.typhoon_csv = typhoon_csv
+        self.frames = frames
+        self.repeat = repeat
+        self.dpi = dpi
+
+    def best(self, fn):
+        """Best wall time of ``repeat`` calls, and the last call's result"""
+        best = float('inf')
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    @staticmethod
+    def timed_import(name):
+        start = time.perf_counter()
+        module = __import__(name)
+        return time.perf_counter() - start, module
+
+class Stopwatch:
+    """Accumulates the time spent in a wrapped callable"""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def wrap(self, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+        return timed
+
+def bench_scraper(ctx):
+    """Offline dataset generation of hk_labor_data_scraper (no network access)"""
+    import_s, mod = ctx.timed_import('hk_labor_data_scraper')
+    scraper = mod.HKLaborDataScraper()
+    generate_s, _ = ctx.best(scraper.create_enhanced_dataset)
+    return {'import_s': import_s, 'generate_s': generate_s}
+
+def bench_analyzer(ctx):
+    import_s, mod = ctx.timed_import('hk_labor_analyzer')
+    load_s, analyzer = ctx.best(lambda: mod.HKLaborAnalyzer(ctx.labor_csv))
+    stats_s, _ = ctx.best(analyzer.basic_statistics)
+    # Rendered into memory and closed, as the render server does (dpi 300 is the script default)
+    plot_s, _ = ctx.best(lambda: analyzer.plot_trends(output=io.BytesIO(), show=False))
+    return {'import_s': import_s, 'load_s': load_s, 'stats_s': stats_s, 'plot_s': plot_s}
+
+def bench_curve(ctx, backend):
+    import_s, mod = ctx.timed_import('hk_unemployment_dynamic_curve')
+
+    # The constructor loads the CSV (load_data) and derives the per-month arrays
+    load_s, animator = ctx.best(lambda: mod.HKUnemploymentCurveAnimator(ctx.labor_csv, seed=0, backend=backend))
+    stats_s, _ = ctx.best(animator.prepare)
+
+    animator.lod.enabled = False
+    particles = Stopwatch()
+    if backend == 'matplotlib':
+        animator.update_particles = particles.wrap(animator.update_particles)
+    else:
+        animator.particles.step = particles.wrap(animator.particles.step)
+
+    render_s = encode_s = particles_s = float('inf')
+    for _ in range(ctx.repeat):
+        animator.reset(seed=0)
+        animator.prepare_render(ctx.dpi)
+        particles.seconds = 0.0
+        rendering = encoding = 0.0
+        previous = None
+        for frame in range(ctx.frames):
+            start = time.perf_counter()
+            rgb = animator.render_frame_array(frame)
+            rendering += time.perf_counter() - start
+            start = time.perf_counter()
+            mod.encode_gif_frame(rgb, previous)
+            previous = rgb.copy()
+            encoding += time.perf_counter() - start
+        animator.finish_render()
+        render_s = min(render_s, rendering)
+        encode_s = min(encode_s, encoding)
+        particles_s = min(particles_s, particles.seconds)
+    return {'import_s': import_s, 'load_s': load_s, 'stats_s': stats_s,
+            'fps': ctx.frames / render_s, 'encode_s': encode_s,
+            'particles_ms': 1000 * particles_s / ctx.frames}
+
+def bench_cyclone(ctx, mode):
+    import_s, mod = ctx.timed_import('create_cyclone_animation')
+    metrics = {'import_s': import_s}
+    if mode == 'years':
+        # The spiral animation does not read the CSV; the per-year one loads it through year_params
+        metrics['load_s'], _ = ctx.best(lambda: mod.year_params(ctx.typhoon_csv))
+        setup_s, comp = ctx.best(lambda: mod.YearCompositor(ctx.typhoon_csv))
+    else:
+        setup_s, comp = ctx.best(mod.FrameCompositor)
+    frame_ids = range(min(ctx.frames, comp.frames))
+
+    # Drop layout alone, then the full frame (band body, drop loop, eye, blur)
+    layout_s, _ = ctx.best(lambda: [comp.drop_layout(f) for f in frame_ids])
+    render_s, images = ctx.best(lambda: [comp.render(f) for f in frame_ids])
+
+    def encode():
+        palette = mod.global_palette([images[i] for i in mod.palette_sample(frame_ids)])
+        writer = mod.GifDeltaWriter(io.BytesIO(), palette, (mod.W, mod.H))
+        for im in images:
+            writer.add(mod.quantize_frame(im, palette))
+        writer.close()
+    encode_s, _ = ctx.best(encode)
+    metrics.update(setup_s=setup_s, layout_s=layout_s, fps=len(frame_ids) / render_s, encode_s=encode_s)
+    return metrics
+
+def bench_typhoon(ctx):
+    # The animation does not read the CSV, so there is no load to time
+    import_s, mod = ctx.timed_import('typhoon_animation')
+    background_s, _ = ctx.best(lambda: mod.create_universe_background(res=900))
+    # A private background cache, filled before timing, so setup_s is always the
+    # warm-cache setup and nothing is written into the source tree
+    with tempfile.TemporaryDirectory(prefix='hk-bench-background-') as cache_dir:
+        mod.universe_background(res=900, cache_dir=cache_dir)
+        setup_s, scene = ctx.best(lambda: mod.TyphoonScene(cache_dir=cache_dir))
+        frame_ids = range(ctx.frames)
+        render_s, _ = ctx.best(lambda: [scene.render_frame(f) for f in frame_ids])
+
+        def encode():
+            # render_gif reports its own encoding time (quantize + write) through ``stats``
+            stats = {}
+            mod.render_gif(frame_ids, stats=stats, cache_dir=cache_dir)
+            return stats['encode_seconds']
+        encode_s = min(encode() for _ in range(ctx.repeat))
+    return {'import_s': import_s, 'background_s': background_s,
+            'setup_s': setup_s, 'fps': len(frame_ids) / render_s, 'encode_s': encode_s}
+
+# name -> (function, whether it depends on the input data size)
+CASES = {
+    'labor_scraper': (bench_scraper, False),
+    'labor_analyzer': (bench_analyzer, True),
+    'curve_matplotlib': (lambda ctx: bench_curve(ctx, 'matplotlib'), True),
+    'curve_raster': (lambda ctx: bench_curve(ctx, 'raster'), True),
+    'cyclone_spiral': (lambda ctx: bench_cyclone(ctx, 'spiral'), False),
+    'cyclone_years': (lambda ctx: bench_cyclone(ctx, 'years'), True),
+    'typhoon_matplotlib': (bench_typhoon, False),
+}
+
+def run_case(args):
+    """Child-process entry point: run one case and write its metrics as JSON"""
+    sys.path[:0] = [LABOR_DIR, TYPHOON_DIR]
+    ctx = Context(args.labor_csv, args.typhoon_csv, args.frames, args.repeat, args.dpi)
+    fn, _ = CASES[args.case]
+    try:
+        # The scripts narrate progress on stdout; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = {'status': 'ok', 'metrics': fn(ctx)}
+    except ImportError as e:
+        result = {'status': 'skipped', 'reason': str(e)}
+    result.setdefault('metrics', {})
+    if result['status'] == 'ok':
+        # ru_maxrss is in KiB on Linux
+        result['metrics']['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with open(args.result, 'w') as fp:
+        json.dump(result, fp)
+
+
+# --- Driver -----------------------------------------------------------------
+
+def environment():
+    import matplotlib
+    import PIL
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'pillow': PIL.__version__,
+    }
+
+def run_suite(cases, scales, frames, repeat, dpi):
+    results = {}
+    inputs = {}
+    with tempfile.TemporaryDirectory(prefix='hk-bench-') as work_dir:
+        datasets = write_datasets(work_dir, scales)
+        for scale, paths in datasets.items():
+            inputs['x%d' % scale] = {name: {'rows': sum(1 for _ in open(path, encoding='utf-8')) - 1,
+                                            'sha256': file_digest(path)}
+                                     for name, path in paths.items()}
+        env = dict(os.environ, MPLBACKEND='Agg', PYTHONHASHSEED='0')
+        for case in cases:
+            data_sized = CASES[case][1]
+            for scale in (scales if data_sized else scales[:1]):
+                key = '%s@x%d' % (case, scale) if data_sized else case
+                result_path = os.path.join(work_dir, 'result.json')
+                cmd = [sys.executable, '-W', 'ignore', os.path.abspath(__file__), '--case', case,
+                       '--labor-csv', datasets[scale]['labor'],
+                       '--typhoon-csv', datasets[scale]['typhoon'],
+                       '--frames', str(frames), '--repeat', str(repeat), '--dpi', str(dpi),
+                       '--result', result_path]
+                print('Running %-28s' % key, end=' ', flush=True)
+                start = time.perf_counter()
+                # The working directory is scratch space for files the scripts write
+                proc = subprocess.run(cmd, cwd=work_dir, env=env,
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                if proc.returncode != 0 or not os.path.exists(result_path):
+                    lines = proc.stderr.strip().splitlines()
+                    reason = lines[-1] if lines else 'exit status %d' % proc.returncode
+                    result = {'status': 'error', 'reason': reason, 'metrics': {}}
+                else:
+                    with open(result_path) as fp:
+                        result = json.load(fp)
+                    os.remove(result_path)
+                print('%s (%.1fs)' % (result['status'], time.perf_counter() - start))
+                results[key] = result
+    return {
+        'schema': SCHEMA,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'settings': {'frames': frames, 'repeat': repeat, 'dpi': dpi, 'scales': list(scales)},
+        'inputs': inputs,
+        'results': results,
+    }
+
+def compare(baseline, current, threshold):
+    """Rows of (case, metric, baseline, current, relative change, regressed)"""
+    rows = []
+    for key, result in sorted(current['results'].items()):
+        base = baseline['results'].get(key)
+        if base is None or base.get('status') != 'ok' or result.get('status') != 'ok':
+            continue
+        for metric, value in sorted(result['metrics'].items()):
+            old = base['metrics'].get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            # Positive "worse" means slower, bigger or fewer frames per second
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append((key, metric, old, value, change, worse > threshold))
+    return rows
+
+def print_report(report):
+    for key, result in report['results'].items():
+        if result['status'] != 'ok':
+            print('%-28s %s: %s' % (key, result['status'], result.get('reason', '')))
+            continue
+        metrics = '  '.join('%s=%.4g' % item for item in sorted(result['metrics'].items()))
+        print('%-28s %s' % (key, metrics))
+
+def print_comparison(rows, threshold):
+    print('%-28s %-14s %12s %12s %9s' % ('case', 'metric', 'baseline', 'current', 'change'))
+    for key, metric, old, new, change, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print('%-28s %-14s %12.4g %12.4g %+8.1f%%%s' % (key, metric, old, new, 100 * change, flag))
+    regressions = sum(row[-1] for row in rows)
+    print('%d metric(s) regressed by more than %.0f%%' % (regressions, 100 * threshold))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the HK labor and typhoon scripts')
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help='comma-separated cases to run (default: all)')
+    parser.add_argument('--scales', default='1,10,100',
+                        help='comma-separated data sizes relative to the shipped CSVs')
+    parser.add_argument('--frames', type=int, default=20, help='frames rendered per case')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is kept)')
+    parser.add_argument('--dpi', type=int, default=100, help='dpi of the curve animation')
+    parser.add_argument('--output', help='write the results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='results JSON to compare against')
+    parser.add_argument('--current', help='compare this results JSON instead of running the suite')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative change counted as a regression (default: 0.10)')
+    # Internal: run a single case in this process
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--labor-csv', help=argparse.SUPPRESS)
+    parser.add_argument('--typhoon-csv', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.case:
+        run_case(args)
+        return 0
+
+    if args.current:
+        with open(args.current) as fp:
+            report = json.load(fp)
+    else:
+        cases = [c.strip() for c in args.cases.split(',') if c.strip()]
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            raise SystemExit('Unknown case(s): %s (choose from %s)' % (', '.join(sorted(unknown)), ', '.join(CASES)))
+        scales = sorted({int(s) for s in args.scales.split(',')})
+        report = run_suite(cases, scales, args.frames, args.repeat, args.dpi)
+        print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, ensure_ascii=False)
+        print('Results written to', args.output)
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        # Scales may differ (only shared cases are compared), but not how they were measured
+        settings = {k: v for k, v in baseline.get('settings', {}).items() if k != 'scales'}
+        if any(report['settings'].get(k) != v for k, v in settings.items()):
+            print('Warning: baseline was run with different settings:', settings)
+        if any(baseline.get('inputs', {}).get(k, v) != v for k, v in report.get('inputs', {}).items()):
+            print('Warning: baseline was run on different input data')
+        regressions = print_comparison(compare(baseline, report, args.threshold), args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
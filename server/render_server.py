@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Local HTTP render server for the labor charts and typhoon animations
+
+Serves the outputs of HKLaborAnalyzer.plot_trends, HKUnemploymentCurveAnimator
+and the two typhoon renderers on demand, instead of writing fixed filenames:
+
+    GET /labor/trends.png?dpi=150
+    GET /labor/curve.gif?fps=20&dpi=100&start=2019-06&end=2022-12&backend=raster&seed=0
+    GET /typhoon/typhoon.gif?frames=80&fps=25
+    GET /typhoon/cyclone.gif?mode=years&duration=150
+    GET /stats                     cache statistics
+    GET /                          routes, their parameters and defaults
+
+Outputs are cached in memory under a key hashed from the route, the
+normalized parameters and the SHA-256 of every input CSV, so editing a CSV
+changes the key. The key doubles as a strong ETag: a request whose
+If-None-Match matches gets 304 without rendering, even after eviction.
+The cache evicts least-recently-used entries past ``--cache-mb``.
+Concurrent requests for the same key share a single render.
+
+    python server/render_server.py --port 8000
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LABOR_DIR = os.path.join(ROOT, 'HK_Labor')
+TYPHOON_DIR = os.path.join(ROOT, 'HK_Typhoon_animation')
+sys.path[:0] = [LABOR_DIR, TYPHOON_DIR]
+
+
+class ParamError(ValueError):
+    """Invalid query parameter (answered with 400)"""
+
+
+class DataFile:
+    """Input CSV whose SHA-256 is recomputed only when its size or mtime changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = None
+        self._digest = None
+        self._lock = threading.Lock()
+
+    def digest(self):
+        st = os.stat(self.path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                with open(self.path, 'rb') as fp:
+                    self._digest = hashlib.sha256(fp.read()).hexdigest()
+                self._stamp = stamp
+            return self._digest
+
+LABOR_DATA = DataFile(os.path.join(LABOR_DIR, 'hk_labor_enhanced.csv'))
+TYPHOON_DATA = DataFile(os.path.join(TYPHOON_DIR, 'hko_tropical_warnings_1956_2024.csv'))
+
+
+# --- Renderers --------------------------------------------------------------
+
+# pyplot keeps global state, so the labor renderers take turns
+PYPLOT_LOCK = threading.Lock()
+
+@lru_cache(maxsize=2)
+def labor_analyzer(digest):
+    from hk_labor_analyzer import HKLaborAnalyzer
+    return HKLaborAnalyzer(LABOR_DATA.path)
+
+@lru_cache(maxsize=2)
+def labor_animator(digest):
+    from hk_unemployment_dynamic_curve import HKUnemploymentCurveAnimator
+    # The constructor loads the CSV
+    return HKUnemploymentCurveAnimator(LABOR_DATA.path)
+
+def render_trends(params, digests):
+    buf = io.BytesIO()
+    with PYPLOT_LOCK:
+        labor_analyzer(digests[0]).plot_trends(output=buf, show=False, dpi=params['dpi'])
+    return buf.getvalue()
+
+def render_curve(params, digests):
+    try:
+        # Fresh animator (own particles and RNG) over the shared, already loaded data
+        animator = labor_animator(digests[0]).subset(params['start'], params['end'],
+                                                     seed=params['seed'], backend=params['backend'])
+    except ValueError as e:
+        raise ParamError(str(e))
+    with PYPLOT_LOCK:
+        return animator.render_gif(fps=params['fps'], dpi=params['dpi'])
+
+def render_typhoon(params, digests):
+    import typhoon_animation
+    return typhoon_animation.render_gif(range(params['frames']), fps=params['fps'])
+
+_cyclone_digest = []
+# The cyclone compositors are module-level caches: a render must not see them
+# cleared halfway, so the digest check, the clear and the render take turns
+CYCLONE_LOCK = threading.Lock()
+
+def render_cyclone(params, digests):
+    import create_cyclone_animation as cyclone
+    duration = params['duration'] or (150 if params['mode'] == 'years' else 40)
+    with CYCLONE_LOCK:
+        if _cyclone_digest != digests:
+            # The compositors read the CSV once; rebuild them when it changes
+            cyclone.compositor.cache_clear()
+            cyclone.frame_palette.cache_clear()
+            _cyclone_digest[:] = digests
+        return cyclone.render_gif(duration=duration, mode=params['mode'])
+
+# path -> (content type, {param: (type, default, allowed)}, input files, renderer)
+# ``allowed`` is a (min, max) range for numbers or a tuple of choices for strings
+ROUTES = {
+    '/labor/trends.png': ('image/png', {
+        'dpi': (int, 150, (50, 300)),
+    }, [LABOR_DATA], render_trends),
+    '/labor/curve.gif': ('image/gif', {
+        'fps': (int, 20, (1, 50)),
+        'dpi': (int, 100, (20, 200)),
+        'start': (str, None, None),
+        'end': (str, None, None),
+        'seed': (int, 0, (0, 2**32 - 1)),
+        'backend': (str, 'raster', ('raster', 'matplotlib')),
+    }, [LABOR_DATA], render_curve),
+    '/typhoon/typhoon.gif': ('image/gif', {
+        'frames': (int, 80, (1, 400)),
+        'fps': (int, 25, (1, 50)),
+    }, [], render_typhoon),
+    '/typhoon/cyclone.gif': ('image/gif', {
+        'mode': (str, 'spiral', ('spiral', 'years')),
+        'duration': (int, None, (10, 1000)),
+    }, [TYPHOON_DATA], render_cyclone),
+}
+
+def parse_params(spec, query):
+    """Validate query parameters against a route's spec, filling in defaults"""
+    params = {}
+    for name, value in parse_qsl(query, keep_blank_values=True):
+        if name not in spec:
+            raise ParamError(f"Unknown parameter '{name}', expected one of {sorted(spec)}")
+        kind, _, allowed = spec[name]
+        try:
+            value = kind(value)
+        except ValueError:
+            raise ParamError(f"Parameter '{name}' must be {kind.__name__}, got {value!r}")
+        if kind is int and not allowed[0] <= value <= allowed[1]:
+            raise ParamError(f"Parameter '{name}' must be between {allowed[0]} and {allowed[1]}")
+        if kind is str and allowed is not None and value not in allowed:
+            raise ParamError(f"Parameter '{name}' must be one of {list(allowed)}")
+        params[name] = value
+    for name, (_, default, _) in spec.items():
+        params.setdefault(name, default)
+    return params
+
+def cache_key(path, params, digests):
+    """Content address of an output: route, normalized parameters and input data"""
+    material = json.dumps([path, sorted(params.items()), digests])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+# --- Cache ------------------------------------------------------------------
+
+class RenderCache:
+    """LRU cache of rendered outputs that coalesces concurrent renders of one key"""
+
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        """Return (body, how) where how is 'hit', 'miss' or 'coalesced'"""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body, 'hit'
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            return future.result(), 'coalesced'
+
+        try:
+            body = render()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            # Stored before the in-flight entry goes, so no request renders it twice
+            self._store(key, body)
+            del self._inflight[key]
+        future.set_result(body)
+        return body, 'miss'
+
+    def _store(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        self._entries[key] = body
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.size -= len(old)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced,
+                    'evictions': self.evictions, 'rendering': len(self._inflight)}
+
+
+# --- HTTP -------------------------------------------------------------------
+
+def etag_matches(header, etag):
+    if header is None:
+        return False
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    # Weak comparison, as If-None-Match requires
+    return etag in tags or 'W/' + etag in tags
+
+class RenderHandler(BaseHTTPRequestHandler):
+    server_version = 'HKRenderServer/1.0'
+    cache = None  # set by make_server
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/':
+            routes = {path: {name: default for name, (_, default, _) in spec.items()}
+                      for path, (_, spec, _, _) in ROUTES.items()}
+            return self._send_json(200, {'routes': routes})
+        if url.path == '/stats':
+            return self._send_json(200, self.cache.stats())
+        if url.path not in ROUTES:
+            return self._send_json(404, {'error': f"No route {url.path}", 'routes': sorted(ROUTES)})
+
+        content_type, spec, data, render = ROUTES[url.path]
+        try:
+            params = parse_params(spec, url.query)
+        except ParamError as e:
+            return self._send_json(400, {'error': str(e)})
+        digests = [d.digest() for d in data]
+        key = cache_key(url.path, params, digests)
+        etag = '"%s"' % key[:32]
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        start = time.perf_counter()
+        try:
+            body, how = self.cache.get_or_render(key, lambda: render(params, digests))
+        except ParamError as e:
+            return self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            self.log_error('Render of %s failed: %r', self.path, e)
+            return self._send_json(500, {'error': f"Render failed: {e}"})
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        # Always revalidate; unchanged outputs come back as 304
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Render-Cache', how)
+        self.send_header('X-Render-Seconds', '%.3f' % (time.perf_counter() - start))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def make_server(host='127.0.0.1', port=8000, cache_mb=256):
+    handler = type('Handler', (RenderHandler,), {'cache': RenderCache(cache_mb * 2**20)})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the labor and typhoon charts over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cache-mb', type=int, default=256, help='output cache size in MB')
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')  # renders only, never opens windows
+    server = make_server(args.host, args.port, args.cache_mb)
+    print(f"Serving on http://{args.host}:{server.server_port}/ (cache {args.cache_mb} MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Batch job specs are validated before any rendering starts"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'HK_Labor'))
+
+import matplotlib
+matplotlib.use('Agg')
+
+from hk_unemployment_dynamic_curve import normalize_job, parse_job_spec, run_batch
+
+
+def test_job_spec_defaults():
+    job = normalize_job(parse_job_spec('output=a.gif,fps=10,resumable=yes'))
+    assert job['fps'] == 10 and job['dpi'] == 100 and job['resumable'] is True
+    assert job['backend'] == 'matplotlib'
+
+
+@pytest.mark.parametrize('spec', [
+    'output=a.gif,fps=0',
+    'output=a.gif,dpi=-5',
+    'output=a.gif,backend=opengl',
+    'fps=10',
+    'output=a.gif,colour=red',
+])
+def test_invalid_job_rejected(spec):
+    with pytest.raises(ValueError):
+        normalize_job(parse_job_spec(spec))
+
+
+def test_bad_job_fails_batch_before_rendering(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    jobs = [{'output': 'first.gif', 'fps': 10}, {'output': 'second.gif', 'fps': 0}]
+    with pytest.raises(ValueError):
+        run_batch(jobs, csv_file=os.path.join(ROOT, 'HK_Labor', 'hk_labor_enhanced.csv'))
+    assert not (tmp_path / 'first.gif').exists()
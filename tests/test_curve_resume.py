@@ -0,0 +1,73 @@
+"""Resumed and incrementally extended curve renders must match a clean render"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'HK_Labor'))
+
+import matplotlib
+matplotlib.use('Agg')
+
+from hk_unemployment_dynamic_curve import HKUnemploymentCurveAnimator
+
+MONTHS = 8
+DPI = 30
+INTERVAL = HKUnemploymentCurveAnimator.CHECKPOINT_INTERVAL
+
+
+@pytest.fixture(scope='module')
+def base():
+    animator = HKUnemploymentCurveAnimator(os.path.join(ROOT, 'HK_Labor', 'hk_labor_enhanced.csv'))
+    assert animator.df is not None
+    return animator
+
+
+def make_animator(base, backend, months=MONTHS):
+    return base.subset(end=base.df['年月'][months - 1], seed=0, backend=backend)
+
+
+def read_blocks(paths):
+    contents = []
+    for path in paths:
+        with open(path, 'rb') as fh:
+            contents.append(fh.read())
+    return contents
+
+
+@pytest.fixture(scope='module', params=HKUnemploymentCurveAnimator.BACKENDS)
+def clean(request, base, tmp_path_factory):
+    """(backend, encoded blocks of an uninterrupted render)"""
+    scratch = tmp_path_factory.mktemp('clean') / 'frames'
+    paths = make_animator(base, request.param).render_frames(str(scratch), dpi=DPI)
+    return request.param, read_blocks(paths)
+
+
+# Before the first checkpoint, between checkpoints, and right after one
+@pytest.mark.parametrize('stop', [5, 2 * INTERVAL + 3, INTERVAL])
+def test_resume_matches_clean_render(base, clean, tmp_path, monkeypatch, stop):
+    backend, reference = clean
+    scratch = str(tmp_path / 'frames')
+
+    interrupted = make_animator(base, backend)
+    render = interrupted.render_frame_array
+    def render_until_stop(frame):
+        if frame == stop:
+            raise KeyboardInterrupt
+        return render(frame)
+    monkeypatch.setattr(interrupted, 'render_frame_array', render_until_stop)
+    with pytest.raises(KeyboardInterrupt):
+        interrupted.render_frames(scratch, dpi=DPI)
+
+    resumed = make_animator(base, backend).render_frames(scratch, dpi=DPI)
+    assert read_blocks(resumed) == reference
+
+
+def test_incremental_matches_clean_render(base, clean, tmp_path):
+    backend, reference = clean
+    scratch = str(tmp_path / 'frames')
+    make_animator(base, backend, MONTHS - 2).render_frames(scratch, dpi=DPI, incremental=True)
+    extended = make_animator(base, backend).render_frames(scratch, dpi=DPI, incremental=True)
+    assert read_blocks(extended) == reference